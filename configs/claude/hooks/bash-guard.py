@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Single PreToolUse entry point for every Bash guard (see guard_rules.py).
+
+Replaces one hook process per guard: the command is parsed once and checked
+against all registered rule sets (git rewrites, protected-branch pushes,
+leading sleep, ...). Codex and Gemini keep using block-git-rewrites.py, which
+runs only the git rules.
+
+Protocol: exit 0 = allow, exit 2 = block with stderr. The override marker
+lifts overridable blocks directly (honor system: the agent must only use it
+after explicit user approval in conversation).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from guard_client import check
+
+
+def main() -> None:
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    tool_name = input_data.get("tool_name", "")
+    command = input_data.get("tool_input", {}).get("command", "")
+
+    # Only check Bash commands
+    if tool_name != "Bash" or not command:
+        sys.exit(0)
+
+    decision = check(command)
+    if decision:
+        # Rules are only imported to report a block.
+        from git_guard import has_override, override_hint
+
+        if decision["overridable"] and has_override(command):
+            sys.exit(0)
+        message = f"Blocked: {decision['message']}"
+        if decision["overridable"]:
+            message += override_hint()
+        print(message, file=sys.stderr)
+        sys.exit(2)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """Exit-code adapter for the shared git-guard hook (git_guard.py in this dir).
 
-Lives in claude/hooks; Codex uses it too via a symlink from codex/hooks.
+Lives in claude/hooks; Codex uses it too via a symlink from codex/hooks, and
+the opencode plugin calls it directly. Each passes `--tool NAME` to label its
+entries in the decision trace.
 
 Protocol: exit 0 = allow, exit 2 = block with stderr. The override marker
 lifts overridable blocks directly (honor system: the agent must only use it
 after explicit user approval in conversation).
+
+Decisions come from the guard daemon via guard_client, which falls back to
+checking in-process when the daemon is down.
 """
 
 import json
@@ -13,7 +18,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from git_guard import check_command, has_override, override_hint
+from guard_client import check
 
 
 def main() -> None:
@@ -31,9 +36,13 @@ def main() -> None:
     if tool_name != "Bash" or not command:
         sys.exit(0)
 
-    result = check_command(command)
+    tool = sys.argv[2] if len(sys.argv) > 2 and sys.argv[1] == "--tool" else "claude"
+    result = check(command, rule_sets=["git"], tool=tool)
     if result:
-        error, overridable = result
+        # Rules are only imported to report a block.
+        from git_guard import has_override, override_hint
+
+        error, overridable = result["message"], result["overridable"]
         if overridable and has_override(command):
             sys.exit(0)
         message = f"Blocked: {error}"
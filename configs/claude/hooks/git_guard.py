@@ -8,10 +8,15 @@ git add -A/--all is never overridable.
 
 This lives in claude/hooks as the canonical copy; the Codex hook is a symlink
 to the adapter here, and the Gemini adapter imports this module by path.
+Adapters normally get decisions from the guard daemon (guard_server.py),
+which keeps this module loaded; see guard_client.py.
 """
 
+import os
 import re
-import subprocess
+from bisect import bisect_left
+
+from git_head import current_branch
 
 OVERRIDE_MARKER = "EXPLICITLY_USER_APPROVED_HOOK_OVERRIDE=1"
 
@@ -36,27 +41,234 @@ BLOCKED_PATTERNS = [
 
 PROTECTED_BRANCHES = {"main", "master"}
 
+# Compiled once at import: a combined matcher answers "does any pattern match"
+# in one pass, and the individual patterns only run to pick the message.
+_BLOCKED = [
+    (re.compile(pattern, re.IGNORECASE), message, overridable)
+    for pattern, message, overridable in BLOCKED_PATTERNS
+]
+_BLOCKED_ANY = re.compile(
+    "|".join(f"(?:{pattern})" for pattern, _, _ in BLOCKED_PATTERNS), re.IGNORECASE
+)
+_PUSH = re.compile(rf"{_GIT_CMD}push\b", re.IGNORECASE)
+_PUSH_ARGS = re.compile(rf"{_GIT_CMD}push\b(.*)$", re.IGNORECASE)
+_PUSH_TO_BRANCH = {
+    branch: re.compile(rf"{_GIT_CMD}push\b.*\b{branch}\b", re.IGNORECASE)
+    for branch in PROTECTED_BRANCHES
+}
+_PUSH_FLAGS = re.compile(r"\s*-[a-zA-Z]\b|\s*--[\w-]+")
+_GIT_DIRECTORY = re.compile(r"\bgit\s+-C\s*(?:\"([^\"]+)\"|'([^']+)'|(\S+))")
+_SEPARATOR = re.compile(r"\s*(?:&&|\|\||[;|])\s*")
+
+# Tokens the single-pass scanner stops at; everything between them is copied.
+# A heredoc opener is only the $(cat <<EOF form: its body is data, while the
+# body of e.g. `bash <<EOF` runs and must still be checked. Complete quoted
+# strings are matched whole; a double-quoted one that nests a heredoc, and
+# any quote without its closer, stop at the bare quote and are resolved
+# separately.
+_HEREDOC_OPENER = r"""\$\(cat\s*<<'?(?P<tag>\w+)'?[^\S\n]*\n"""
+_SCAN_TOKENS = {
+    "heredoc": _HEREDOC_OPENER,
+    "single": r"'[^']*'",
+    "double": r'"(?:[^"\\$]|\\.|\$(?!\(cat\s*<<))*"',
+    "quote": r"[\"']",
+    "separator": r"&&|\|\||[;|]",
+}
+# Not DOTALL: a backslash-newline ends the quick "double" match, see
+# _double_quote_end.
+_SCAN_TOKEN = re.compile(
+    "|".join(f"(?P<{kind}>{pattern})" for kind, pattern in _SCAN_TOKENS.items())
+)
+# Once one double quote is known to be unterminated every later one is too;
+# trying the "double" alternative again would run to the end each time.
+_SCAN_TOKEN_UNTERMINATED = re.compile(
+    "|".join(
+        f"(?P<{kind}>{pattern})"
+        for kind, pattern in _SCAN_TOKENS.items()
+        if kind != "double"
+    )
+)
+# Inside double quotes only escapes, the closing quote and a nested heredoc
+# (`-m "$(cat <<'EOF' ...)"`) matter.
+_DOUBLE_QUOTE_TOKEN = re.compile(rf"""\\.|"|{_HEREDOC_OPENER}""", re.DOTALL)
+# The line closing a heredoc: the tag, indented by blanks only (\s would run
+# over every following blank line from each newline), then the ), which may
+# be on a later line.
+_HEREDOC_CLOSER = re.compile(r"\n[^\S\n]*(\w+)\s*\)")
+_SEPARATOR_TOKEN = re.compile(r"(&&|\|\|?|;)")
+# Without a heredoc, a command whose quotes all close needs no scanning: one
+# substitution replaces its strings. The possessive check that they all
+# close fails in linear time, and a backslash-newline fails it as above.
+_QUOTED = re.compile(r"'[^']*'" r'|"(?:[^"\\]|\\.)*"')
+_BALANCED = re.compile(rf"(?:[^\"']++|{_QUOTED.pattern})*+")
+# The regex stripping scan() replaced, kept for commands with a heredoc or an
+# unclosed quote:
+# each pattern is anchored so that a string without its closer fails once
+# instead of once per later quote.
+_LEGACY_HEREDOC_OPENER = re.compile(r"\$\(cat\s*<<'?(\w+)'?\s*\n")
+_LEGACY_DOUBLE_QUOTED = re.compile(r'"(?:[^"\\]|\\.)*(")?')  # . stops at \n
+_LEGACY_SINGLE_QUOTED = re.compile(r"'[^']*'")
+
+
+class _ScanState:
+    """What one scan of a command has learned so far.
+
+    Heredoc closers are indexed per tag in one pass on first use, so each
+    opener costs a bisect instead of a search to the end. Any construct
+    without its closer sets recheck, as does any heredoc: the old stripping
+    then checks the command as well.
+    """
 
-def strip_quoted_strings(command: str) -> str:
-    """Remove quoted strings and heredocs to avoid false positives.
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.closers: dict[str, tuple[list[int], list[int]]] | None = None
+        self.double_unterminated = False
+        self.recheck = False
+
+    def closer(self, tag: str, start: int) -> int | None:
+        """End of the first closer of tag whose line starts at or after start."""
+        if self.closers is None:
+            self.closers = {}
+            for match in _HEREDOC_CLOSER.finditer(self.command):
+                starts, ends = self.closers.setdefault(match.group(1), ([], []))
+                starts.append(match.start())
+                ends.append(match.end())
+        starts, ends = self.closers.get(tag, ((), ()))
+        index = bisect_left(starts, start)
+        return ends[index] if index < len(starts) else None
+
+
+def _heredoc_end(state: _ScanState, tag: str, body_start: int) -> int | None:
+    """Return the index just past a $(cat <<TAG ... TAG) body, if it closes."""
+    end = state.closer(tag, body_start - 1)
+    if end is None:
+        state.recheck = True
+    return end
+
+
+def _double_quote_end(state: _ScanState, start: int) -> int | None:
+    """Return the index just past the double-quoted string opening at start."""
+    if state.double_unterminated:
+        return None
+    position = start + 1
+    while match := _DOUBLE_QUOTE_TOKEN.search(state.command, position):
+        token = match.group()
+        if token == '"':
+            return match.end()
+        if token == "\\\n":
+            # The old stripping never removed a string with a line
+            # continuation; treat it as unterminated so those commands are
+            # still checked the old way as well.
+            break
+        if match.group("tag"):
+            end = _heredoc_end(state, match.group("tag"), match.end())
+            position = end if end is not None else match.start() + 1
+        else:
+            position = match.end()
+    state.double_unterminated = state.recheck = True
+    return None
 
-    This prevents matching 'git push' inside commit messages, PR bodies, etc.
+
+def _scan(command: str) -> tuple[list[tuple[str, str]], bool]:
+    """scan(), plus whether the old stripping must check the command too."""
+    if "<<" not in command and _BALANCED.fullmatch(command):
+        parts = _SEPARATOR_TOKEN.split(_QUOTED.sub(" ", command))
+        return list(zip(parts[::2], [*parts[1::2], ""])), False
+
+    state = _ScanState(command)
+    # The old stripping removed heredocs before quotes, which reads some
+    # overlaps differently; commands with one are checked both ways.
+    state.recheck = "<<" in command
+    segments: list[tuple[str, str]] = []
+    pieces: list[str] = []
+    position = 0
+    token = _SCAN_TOKEN
+    while match := token.search(command, position):
+        pieces.append(command[position : match.start()])
+        kind = match.lastgroup if match.lastgroup != "tag" else "heredoc"
+        end: int | None
+        if kind == "separator":
+            segments.append(("".join(pieces), match.group()))
+            pieces = []
+            position = match.end()
+            continue
+        if kind in ("single", "double"):
+            end = match.end()
+        elif kind == "heredoc":
+            end = _heredoc_end(state, match.group("tag"), match.end())
+        elif match.group() == '"':
+            end = _double_quote_end(state, match.start())
+            if state.double_unterminated:
+                token = _SCAN_TOKEN_UNTERMINATED
+        else:
+            # A single quote the "single" alternative could not close.
+            end = None
+            state.recheck = True
+        if end is None:
+            # Unterminated: keep the opening character and scan on from there.
+            pieces.append(command[match.start()])
+            position = match.start() + 1
+        else:
+            pieces.append(" ")
+            position = end
+    pieces.append(command[position:])
+    segments.append(("".join(pieces), ""))
+    return segments, state.recheck
+
+
+def _legacy_strip(command: str) -> str:
+    """The regex stripping scan() replaced, in linear time.
+
+    Heredocs first, then double-quoted strings, then single-quoted ones,
+    each as its own pass. Commands scan() flags are also checked this way,
+    so that it never lets through what this blocked.
     """
-    # Remove heredocs: $(cat <<'EOF' ... EOF) or $(cat <<EOF ... EOF)
-    result = re.sub(
-        r"\$\(cat\s*<<'?(\w+)'?\s*\n.*?\n\s*\1\s*\)",
-        " ",
-        command,
-        flags=re.DOTALL,
+    state = _ScanState(command)
+    pieces: list[str] = []
+    position = 0
+    for match in _LEGACY_HEREDOC_OPENER.finditer(command):
+        if match.start() < position:
+            continue
+        # Its opener's \s*\n takes all blank lines, then gives them back.
+        end = state.closer(match.group(1), match.end())
+        if end is None:
+            first_newline = command.index("\n", match.end(1))
+            end = state.closer(match.group(1), first_newline + 1)
+        if end is not None:
+            pieces += [command[position : match.start()], " "]
+            position = end
+    pieces.append(command[position:])
+    stripped = _LEGACY_DOUBLE_QUOTED.sub(
+        lambda match: " " if match.group(1) else match.group(), "".join(pieces)
     )
+    return _LEGACY_SINGLE_QUOTED.sub(" ", stripped)
 
-    # Remove double-quoted strings (handling escaped quotes)
-    result = re.sub(r'"(?:[^"\\]|\\.)*"', " ", result)
 
-    # Remove single-quoted strings (no escaping in single quotes)
-    result = re.sub(r"'[^']*'", " ", result)
+def scan(command: str) -> list[tuple[str, str]]:
+    """Tokenize a command in one left-to-right pass.
+
+    Quoted strings and $(cat <<EOF ... EOF) heredocs are replaced by a space
+    so 'git push' inside commit messages, PR bodies, etc. never matches, and
+    the result is split on the separators &&, ||, ; and |. Returns
+    (segment, separator that follows it) pairs. Each position is consumed
+    by at most a constant number of regex searches or jumps: a double quote
+    or heredoc tag found unterminated once is not searched for again, and
+    heredoc closers are indexed in one pass, so the cost is linear in the
+    length.
+    """
+    return _scan(command)[0]
+
+
+def strip_quoted_strings(command: str) -> str:
+    """Remove quoted strings and heredocs to avoid false positives.
 
-    return result
+    This prevents matching 'git push' inside commit messages, PR bodies, etc.
+    A command with a heredoc or an unterminated quote gets the old regex
+    stripping of it appended after a separator.
+    """
+    segments, recheck = _scan(command)
+    stripped = "".join(segment + separator for segment, separator in segments)
+    return f"{stripped};{_legacy_strip(command)}" if recheck else stripped
 
 
 def extract_git_directory(command: str) -> str | None:
@@ -65,21 +277,34 @@ def extract_git_directory(command: str) -> str | None:
     Handles: git -C /path, git -C"/path", git -C '/path'
     """
     # Match -C with optional space, then quoted or unquoted path
-    match = re.search(
-        r"\bgit\s+-C\s*(?:\"([^\"]+)\"|'([^']+)'|(\S+))",
-        command,
-    )
+    match = _GIT_DIRECTORY.search(command)
     if match:
         return match.group(1) or match.group(2) or match.group(3)
     return None
 
 
-def get_current_branch(git_dir: str | None = None) -> str | None:
+def get_current_branch(
+    git_dir: str | None = None, cwd: str | None = None
+) -> str | None:
     """Get the current git branch name.
 
+    Reads HEAD in-process (git_head.py) and only spawns git when the
+    repository layout is something that reader does not handle.
+
     Args:
         git_dir: Optional directory to check (for git -C support)
+        cwd: Directory the command runs in (defaults to this process's cwd)
     """
+    base = cwd or os.getcwd()
+    path = os.path.join(base, os.path.expanduser(git_dir)) if git_dir else base
+    branch = current_branch(path)
+    if branch is not None:
+        return branch
+
+    # Imported here: adapters import this module for the override helpers on
+    # every call, and subprocess dominates the import time.
+    import subprocess
+
     try:
         cmd = ["git"]
         if git_dir:
@@ -90,9 +315,10 @@ def get_current_branch(git_dir: str | None = None) -> str | None:
             capture_output=True,
             text=True,
             timeout=5,
+            cwd=cwd,
         )
         return result.stdout.strip() if result.returncode == 0 else None
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+    except (subprocess.TimeoutExpired, OSError):
         return None
 
 
@@ -101,47 +327,49 @@ def check_blocked_patterns(command: str) -> tuple[str, bool] | None:
 
     Returns (error message, overridable) if blocked, None if allowed.
     """
-    for pattern, message, overridable in BLOCKED_PATTERNS:
-        if re.search(pattern, command, re.IGNORECASE):
+    if not _BLOCKED_ANY.search(command):
+        return None
+    for pattern, message, overridable in _BLOCKED:
+        if pattern.search(command):
             return message, overridable
     return None
 
 
 def check_push_to_protected_branch(
-    command: str, original_command: str | None = None
+    command: str, original_command: str | None = None, cwd: str | None = None
 ) -> str | None:
     """Check if command pushes to a protected branch.
 
     Args:
         command: The command to check (may have quotes stripped)
         original_command: Original command with quotes intact (for -C extraction)
+        cwd: Directory the command runs in (defaults to this process's cwd)
 
     Returns error message if blocked, None if allowed.
     """
     # Pattern: git (with optional global options) push
-    git_push_pattern = rf"{_GIT_CMD}push\b"
-    if not re.search(git_push_pattern, command, re.IGNORECASE):
+    if not _PUSH.search(command):
         return None
 
     # Check for explicit push to protected branch (e.g., git push origin main)
-    for branch in PROTECTED_BRANCHES:
-        if re.search(rf"{_GIT_CMD}push\b.*\b{branch}\b", command, re.IGNORECASE):
+    for branch, pattern in _PUSH_TO_BRANCH.items():
+        if pattern.search(command):
             return f"git push to {branch} is not allowed - use a PR"
 
     # Check if currently on protected branch and pushing without explicit branch
     # This matches: "git push", "git push origin", "git -C /path push"
     # But not: "git push origin feature-branch", "git stash push"
-    push_match = re.search(rf"{_GIT_CMD}push\b(.*)$", command, re.IGNORECASE)
+    push_match = _PUSH_ARGS.search(command)
     if push_match:
         args = push_match.group(1).strip()
         # Remove flags like -u, --set-upstream, etc.
-        args_without_flags = re.sub(r"\s*-[a-zA-Z]\b|\s*--[\w-]+", "", args).strip()
+        args_without_flags = _PUSH_FLAGS.sub("", args).strip()
         parts = args_without_flags.split()
         # If 0 or 1 parts (no args or just remote), check current branch
         if len(parts) <= 1:
             # Extract -C directory from original command (preserves quoted paths)
             git_dir = extract_git_directory(original_command or command)
-            current_branch = get_current_branch(git_dir)
+            current_branch = get_current_branch(git_dir, cwd)
             if current_branch in PROTECTED_BRANCHES:
                 return f"git push while on {current_branch} is not allowed - use a PR"
 
@@ -156,28 +384,44 @@ def split_shell_commands(command: str) -> list[str]:
     """
     # Split on shell command separators, keeping it simple
     # This handles: cmd1 && cmd2, cmd1 || cmd2, cmd1 ; cmd2, cmd1 | cmd2
-    parts = re.split(r"\s*(?:&&|\|\||[;|])\s*", command)
+    parts = _SEPARATOR.split(command)
     return [p.strip() for p in parts if p.strip()]
 
 
-def check_command(command: str) -> tuple[str, bool] | None:
+def parse_segments(command: str) -> list[str]:
+    """Strip quoted strings from a command and split it into segments.
+
+    This is the parse every Bash guard rule runs on; guard_rules.py does it
+    once per command and shares the result between rule sets.
+    """
+    scanned, recheck = _scan(command)
+    segments = [segment.strip() for segment, _ in scanned]
+    if recheck:
+        # A heredoc or an unclosed quote: check the old reading as well.
+        segments += split_shell_commands(_legacy_strip(command))
+    return [segment for segment in segments if segment]
+
+
+def check_command(command: str, cwd: str | None = None) -> tuple[str, bool] | None:
     """Check a shell command for dangerous git operations.
 
     Returns (error message, overridable) if blocked, None if allowed.
+    cwd is where the command runs, for resolving the branch of a bare push.
     A non-overridable violation anywhere in the command wins over an
     overridable one, so a chained command can't ride an override past
     a hard block (e.g. "MARKER git commit --amend && git add -A").
     """
-    stripped = strip_quoted_strings(command)
     first_overridable: tuple[str, bool] | None = None
 
     # Split on shell separators and check each command individually
-    for cmd in split_shell_commands(stripped):
+    for cmd in parse_segments(command):
         result = check_blocked_patterns(cmd)
         if result is None:
             # For branch detection, find corresponding original command segment
             # Use the full original for -C extraction (it's OK if imprecise)
-            error = check_push_to_protected_branch(cmd, original_command=command)
+            error = check_push_to_protected_branch(
+                cmd, original_command=command, cwd=cwd
+            )
             if error:
                 result = error, True
         if result:
@@ -188,6 +432,11 @@ def check_command(command: str) -> tuple[str, bool] | None:
     return first_overridable
 
 
+def mentions_push(command: str) -> bool:
+    """Check whether a command runs git push, the only branch-dependent rule."""
+    return _PUSH.search(strip_quoted_strings(command)) is not None
+
+
 def has_override(command: str) -> bool:
     """Check if the command carries the user-approved override marker."""
     return OVERRIDE_MARKER in command
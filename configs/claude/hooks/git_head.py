@@ -0,0 +1,92 @@
+"""Read the current git branch straight from the repository files.
+
+Used by the protected-branch push check (git_guard.py) and the statusline
+instead of spawning `git branch --show-current`. Handles `.git` files, so
+linked worktrees and submodules resolve to their own HEAD.
+
+Anything unusual (GIT_DIR in the environment, the reftable backend, an
+unreadable HEAD) resolves to None, and callers fall back to asking git.
+"""
+
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Repository:
+    worktree: str  # top-level directory of the checkout
+    git_dir: str  # directory holding this checkout's HEAD
+
+
+# HEAD path -> ((inode, mtime_ns, size), branch). Git replaces HEAD through a
+# lockfile rename, so any checkout changes the stamp.
+_BRANCH_CACHE: dict[str, tuple[tuple[int, int, int], str | None]] = {}
+
+
+def _read_gitdir_file(path: str) -> str | None:
+    """Resolve a `.git` file (`gitdir: <path>`) to the directory it names."""
+    try:
+        with open(path) as f:
+            content = f.read().strip()
+    except (OSError, UnicodeError):
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    target = content[len("gitdir:") :].strip()
+    return os.path.normpath(os.path.join(os.path.dirname(path), target))
+
+
+def find_repository(path: str) -> Repository | None:
+    """Find the repository containing path, walking up like git does."""
+    if "GIT_DIR" in os.environ or "GIT_WORK_TREE" in os.environ:
+        return None
+    directory = os.path.abspath(os.path.expanduser(path))
+    if not os.path.isdir(directory):
+        return None
+    while True:
+        candidate = os.path.join(directory, ".git")
+        if os.path.isdir(candidate):
+            return Repository(worktree=directory, git_dir=candidate)
+        if os.path.isfile(candidate):
+            git_dir = _read_gitdir_file(candidate)
+            return Repository(worktree=directory, git_dir=git_dir) if git_dir else None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def head_branch(git_dir: str) -> str | None:
+    """Return the branch HEAD points at ("" when detached), or None if unknown."""
+    head = os.path.join(git_dir, "HEAD")
+    try:
+        stat = os.stat(head)
+    except OSError:
+        return None
+    stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    cached = _BRANCH_CACHE.get(head)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        with open(head) as f:
+            content = f.read().strip()
+    except (OSError, UnicodeError):
+        return None
+    if content.startswith("ref: refs/heads/"):
+        branch = content[len("ref: refs/heads/") :]
+        # The reftable backend leaves a placeholder HEAD; only git can answer.
+        branch = None if branch == ".invalid" else branch
+    elif content.startswith("ref:"):
+        branch = None
+    else:
+        branch = ""
+    _BRANCH_CACHE[head] = (stamp, branch)
+    return branch
+
+
+def current_branch(path: str) -> str | None:
+    """Return the branch checked out at path ("" when detached), or None."""
+    repository = find_repository(path)
+    if repository is None:
+        return None
+    return head_branch(repository.git_dir)
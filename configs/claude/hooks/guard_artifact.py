@@ -0,0 +1,113 @@
+"""Versioned export of the guard rules shared by every agent adapter.
+
+The Python rule modules stay canonical; this writes what the adapters read
+from them once into $XDG_CACHE_HOME/agent-guard/rules.json: the override
+marker and, per rule set, the keywords a command must contain for any rule
+in that set to fire. Adapters load it cheaply (one JSON read and a few
+stats) and let a command that contains none of the keywords through without
+asking the daemon or importing the rules: guard_client.py does this for the
+Claude, Codex and Gemini adapters, and the opencode plugin does it before
+spawning Python at all.
+
+The artifact records the mtime and size of each rule module it was built
+from. Loaders reject it when the version or any stamp differs, and the
+daemon writes a fresh one when it starts.
+
+Kept free of rule-module imports so loading stays cheap; build() imports
+them lazily.
+"""
+
+import json
+import os
+from pathlib import Path
+
+ARTIFACT_VERSION = 2
+
+HERE = Path(__file__).resolve().parent
+# Modules whose contents determine decisions.
+RULE_MODULES = [
+    HERE / name
+    for name in ("git_guard.py", "git_head.py", "sleep_guard.py", "guard_rules.py")
+]
+
+
+def artifact_path() -> Path:
+    root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return root / "agent-guard" / "rules.json"
+
+
+def source_stamps() -> dict[str, list[int]] | None:
+    """mtime (whole milliseconds, readable from JS too) and size per module."""
+    stamps = {}
+    for path in RULE_MODULES:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        stamps[str(path)] = [stat.st_mtime_ns // 1_000_000, stat.st_size]
+    return stamps
+
+
+def build() -> dict:
+    """Collect the rule data from the canonical modules."""
+    from git_guard import OVERRIDE_MARKER
+    from guard_rules import RULES
+
+    keywords: dict[str, list[str] | None] = {}
+    for rule in RULES:
+        if rule.keywords is None or keywords.get(rule.rule_set, []) is None:
+            keywords[rule.rule_set] = None
+            continue
+        merged = keywords.setdefault(rule.rule_set, [])
+        merged.extend(word for word in rule.keywords if word not in merged)
+    return {
+        "version": ARTIFACT_VERSION,
+        "sources": source_stamps(),
+        "override_marker": OVERRIDE_MARKER,
+        "keywords": keywords,
+    }
+
+
+def write() -> None:
+    """Export the current rules, atomically; failures are ignored."""
+    path = artifact_path()
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary.write_text(json.dumps(build(), indent=2) + "\n")
+        temporary.replace(path)
+    except OSError:
+        try:
+            temporary.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def load() -> dict | None:
+    """Return the artifact, or None if it is missing, foreign or stale."""
+    try:
+        artifact = json.loads(artifact_path().read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("version") != ARTIFACT_VERSION:
+        return None
+    stamps = source_stamps()
+    if stamps is None or artifact.get("sources") != stamps:
+        return None
+    return artifact
+
+
+def may_block(artifact: dict, command: str, rule_sets: list[str] | None) -> bool:
+    """Check whether any selected rule set could fire on this command."""
+    # Case-insensitive regexes also match some non-ASCII letters (ſ for s);
+    # leave such commands to the rules themselves.
+    if not command.isascii():
+        return True
+    keywords = artifact["keywords"]
+    selected = keywords if rule_sets is None else rule_sets
+    folded = command.lower()
+    for rule_set in selected:
+        words = keywords.get(rule_set)
+        if words is None or any(word in folded for word in words):
+            return True
+    return False
@@ -0,0 +1,168 @@
+"""Persistent LRU of guard decisions (see guard_rules.py).
+
+Agents repeat the same commands all session (`git status && git diff`, test
+runners, linters), so evaluate() remembers each decision in a small SQLite
+table under $XDG_CACHE_HOME/agent-guard, keyed on a hash of the command, the
+selected rule sets and the rule modules' stamps (editing a rule drops every
+entry). A repeat decision is a single primary-key lookup. Only the daemon
+uses it: it restarts when a rule module changes, so the stamp is taken once
+at import. A hit then costs about 10 us, against 13 us and up for
+evaluating; commands shorter than MIN_LENGTH gain too little to be worth
+the write and are not cached.
+
+Only a git push can depend on repository state (the current branch), so for
+commands containing one the row also stores the state of the HEAD file the
+push would read, and a hit requires that file to be unchanged. Pushes whose
+branch only git itself can resolve are never cached. The table is bounded to
+MAX_ENTRIES rows, least recently used evicted first. Any database problem
+degrades to an uncached evaluation.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from git_guard import extract_git_directory, mentions_push
+from git_head import find_repository, head_branch
+from guard_artifact import RULE_MODULES
+from guard_rules import Decision, evaluate as evaluate_uncached
+
+MAX_ENTRIES = 5000
+# `git status`, `ls -la`: evaluated about as fast as they are looked up.
+MIN_LENGTH = 16
+# Refreshing the LRU timestamp is a write; skip it for entries used recently.
+TOUCH_INTERVAL = 60
+_connection: sqlite3.Connection | None = None
+
+
+def cache_path() -> Path:
+    root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return root / "agent-guard" / "decisions.sqlite3"
+
+
+def rules_stamp() -> str:
+    """Identify the rule modules on disk by inode, mtime and size."""
+    parts = []
+    for path in RULE_MODULES:
+        try:
+            stat = path.stat()
+        except OSError:
+            parts.append("-")
+            continue
+        parts.append(f"{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}")
+    return ",".join(parts)
+
+
+# The rules this process imported; they do not change while it runs.
+_RULES_STAMP = rules_stamp()
+
+
+def connect() -> sqlite3.Connection:
+    """Open (once per process) the decision table."""
+    global _connection
+    if _connection is None:
+        path = cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=0.2, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            "key TEXT PRIMARY KEY, decision TEXT NOT NULL, head TEXT NOT NULL, "
+            "used REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS decisions_used ON decisions (used)")
+        _connection = connection
+    return _connection
+
+
+def head_state(command: str, cwd: str | None) -> str | None:
+    """Describe the HEAD file a push in this command would read.
+
+    Returns "" for commands without a git push (not branch-dependent), and
+    None when the branch is only known to git itself, which is not cached.
+    """
+    if not mentions_push(command):
+        return ""
+    base = cwd or os.getcwd()
+    git_dir = extract_git_directory(command)
+    path = os.path.join(base, os.path.expanduser(git_dir)) if git_dir else base
+    repository = find_repository(path)
+    if repository is None or head_branch(repository.git_dir) is None:
+        return None
+    stat = os.stat(os.path.join(repository.git_dir, "HEAD"))
+    return f"{repository.git_dir}:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def cache_key(command: str, rule_sets: list[str] | None) -> str:
+    selected = ",".join(sorted(rule_sets)) if rule_sets is not None else "*"
+    material = "\0".join((_RULES_STAMP, selected, command.strip()))
+    return hashlib.sha256(material.encode(errors="surrogateescape")).hexdigest()
+
+
+def evaluate(
+    command: str,
+    cwd: str | None = None,
+    rule_sets: list[str] | None = None,
+    timings: dict[str, float] | None = None,
+) -> Decision | None:
+    """guard_rules.evaluate, answered from the cache when possible.
+
+    Time spent on the cache itself is added to timings["cache"].
+    """
+    if len(command) < MIN_LENGTH:
+        return evaluate_uncached(command, cwd, rule_sets, timings)
+    spent = timings if timings is not None else {}
+    start = time.perf_counter()
+    try:
+        connection = connect()
+        key = cache_key(command, rule_sets)
+        row = connection.execute(
+            "SELECT decision, head, used FROM decisions WHERE key = ?", (key,)
+        ).fetchone()
+    except (OSError, sqlite3.Error):
+        return evaluate_uncached(command, cwd, rule_sets, spent)
+
+    now = time.time()
+    if row is not None:
+        stored, head, used = row
+        if head == "" or head == head_state(command, cwd):
+            if now - used > TOUCH_INTERVAL:
+                try:
+                    connection.execute(
+                        "UPDATE decisions SET used = ? WHERE key = ?", (now, key)
+                    )
+                except sqlite3.Error:
+                    pass
+            decision = json.loads(stored)
+            spent["cache"] = spent.get("cache", 0.0) + time.perf_counter() - start
+            return Decision(**decision) if decision else None
+
+    # Read HEAD before evaluating so a concurrent checkout invalidates the row.
+    head = head_state(command, cwd)
+    spent["cache"] = spent.get("cache", 0.0) + time.perf_counter() - start
+    decision = evaluate_uncached(command, cwd, rule_sets, spent)
+    if head is None:
+        return decision
+    start = time.perf_counter()
+    stored = json.dumps(asdict(decision) if decision else None)
+    try:
+        cursor = connection.execute(
+            "INSERT OR REPLACE INTO decisions (key, decision, head, used) "
+            "VALUES (?, ?, ?, ?)",
+            (key, stored, head, now),
+        )
+        if cursor.lastrowid and cursor.lastrowid % 64 == 0:
+            connection.execute(
+                "DELETE FROM decisions WHERE key IN (SELECT key FROM decisions "
+                "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (MAX_ENTRIES,),
+            )
+    except sqlite3.Error:
+        pass
+    spent["cache"] += time.perf_counter() - start
+    return decision
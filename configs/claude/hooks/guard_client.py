@@ -0,0 +1,173 @@
+"""Client for the guard daemon (guard_server.py in this dir).
+
+The adapters call check() instead of importing the rule modules: it asks the
+daemon over its unix socket, which answers from rules that are already loaded.
+When the daemon is not running it is started in the background and this one
+check runs in-process, so a missing or broken daemon never changes a decision.
+Before either, the shared rule artifact (guard_artifact.py) lets a command
+that no selected rule could block through without contacting the daemon.
+
+Kept free of heavy imports: the fast path only needs json and socket.
+"""
+
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+import guard_artifact
+
+CONNECT_TIMEOUT = 1.0
+# guard_trace.MAX_TRACE_BYTES; the prefilter path does not import guard_trace.
+MAX_TRACE_BYTES = 1024 * 1024
+
+
+def socket_path() -> str:
+    """Per-user socket location (runtime dir on Linux, $TMPDIR on macOS)."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(runtime, f"agent-guard-{os.getuid()}.sock")
+
+
+def query(
+    command: str, cwd: str, rule_sets: list[str] | None, tool: str
+) -> dict | None:
+    """Ask the daemon for a decision, or return None if it is unreachable."""
+    # GIT_DIR and friends pick the repository a push goes to; the daemon
+    # evaluates with this hook's, not with its own.
+    environment = {
+        name: value for name, value in os.environ.items() if name.startswith("GIT_")
+    }
+    request = {
+        "command": command,
+        "cwd": cwd,
+        "rule_sets": rule_sets,
+        "tool": tool,
+        "env": environment,
+    }
+    path = socket_path()
+    try:
+        # Outside XDG_RUNTIME_DIR the socket may sit in a shared /tmp, where
+        # another user could bind it first and answer "allow"; only trust a
+        # socket we own. /tmp's sticky bit keeps others from swapping it.
+        if os.stat(path).st_uid != os.getuid():
+            return None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CONNECT_TIMEOUT)
+            client.connect(path)
+            client.sendall(json.dumps(request).encode() + b"\n")
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def start_server() -> None:
+    """Launch the daemon detached from this hook process."""
+    import subprocess
+
+    try:
+        subprocess.Popen(
+            [sys.executable, str(HERE / "guard_server.py")],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def after_output(function, *args) -> None:
+    """Call function at exit, once the adapter's output is flushed.
+
+    The interpreter runs atexit handlers before it flushes stdout, so the
+    decision would otherwise wait for the trace write.
+    """
+    import atexit
+
+    def run() -> None:
+        try:
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            pass
+        function(*args)
+
+    atexit.register(run)
+
+
+def trace_allowed(tool: str, override: bool, seconds: float) -> None:
+    """Append guard_trace.record()'s allow record for a prefilter pass.
+
+    Written inline with one stat, open and write, since importing
+    guard_trace costs more than the prefilter saves. The artifact just
+    loaded from the same directory, so it exists.
+    """
+    entry = {
+        "ts": round(time.time(), 3),
+        "tool": tool,
+        "rule": None,
+        "decision": "allow",
+        "override": override,
+        "us": {"prefilter": round(seconds * 1e6, 1)},
+    }
+    path = str(guard_artifact.artifact_path().with_name("trace.jsonl"))
+    try:
+        if os.stat(path).st_size > MAX_TRACE_BYTES:
+            os.replace(path, path + ".1")
+    except OSError:
+        pass
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, (json.dumps(entry, separators=(",", ":")) + "\n").encode())
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def check(
+    command: str,
+    cwd: str | None = None,
+    rule_sets: list[str] | None = None,
+    tool: str = "claude",
+) -> dict | None:
+    """Evaluate guard rules (all sets by default) against a command.
+
+    Returns the blocking decision as {"rule", "message", "overridable"}, or
+    None if the command is allowed. tool names the calling agent in the
+    decision trace.
+    """
+    start = time.perf_counter()
+    artifact = guard_artifact.load()
+    if artifact is not None and not guard_artifact.may_block(artifact, command, rule_sets):
+        seconds = time.perf_counter() - start
+        override = artifact["override_marker"] in command
+        after_output(trace_allowed, tool, override, seconds)
+        return None
+
+    cwd = cwd or os.getcwd()
+    response = query(command, cwd, rule_sets, tool)
+    if response is not None:
+        return response["decision"]
+    # The daemon re-exports a missing or stale artifact when it starts.
+    start_server()
+    from dataclasses import asdict
+
+    from git_guard import has_override
+    from guard_rules import evaluate  # the cache would cost a sqlite3 import
+    from guard_trace import record
+
+    timings = {}
+    decision = evaluate(command, cwd, rule_sets, timings)
+    result = asdict(decision) if decision else None
+    after_output(record, tool, result, has_override(command), timings)
+    return result
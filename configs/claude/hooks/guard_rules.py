@@ -0,0 +1,115 @@
+"""Declarative registry of the Bash guard rules, dispatched over one parse.
+
+Each rule checks a single command segment from git_guard.parse_segments and
+returns (message, overridable) or None. evaluate() parses the command once and
+runs every registered rule against the shared segments, with the precedence of
+git_guard.check_command: within a segment the first rule that fires wins, a
+non-overridable block anywhere wins outright, and otherwise the first
+overridable block is returned.
+
+Adding a guard means appending a GuardRule here; the hook entry point
+(bash-guard.py) and the daemon pick it up without another process spawn.
+Its keywords feed the shared rule artifact (guard_artifact.py), which lets
+adapters skip commands no rule could block.
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from time import perf_counter
+
+from git_guard import (
+    check_blocked_patterns,
+    check_push_to_protected_branch,
+    parse_segments,
+)
+from sleep_guard import MESSAGE as SLEEP_MESSAGE
+from sleep_guard import segment_starts_with_sleep
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One parsed segment plus the context some rules need."""
+
+    text: str
+    command: str
+    cwd: str | None
+
+
+@dataclass(frozen=True)
+class GuardRule:
+    name: str
+    rule_set: str
+    check: Callable[[Segment], tuple[str, bool] | None]
+    # Trace phase the rule's time is charged to (see guard_trace.py).
+    phase: str = "match"
+    # Lowercase literals of which every command the rule blocks contains at
+    # least one (case-insensitively); None if there is no such set.
+    keywords: tuple[str, ...] | None = None
+
+
+@dataclass(frozen=True)
+class Decision:
+    rule: str
+    message: str
+    overridable: bool
+
+
+def _protected_push(segment: Segment) -> tuple[str, bool] | None:
+    error = check_push_to_protected_branch(
+        segment.text, original_command=segment.command, cwd=segment.cwd
+    )
+    return (error, True) if error else None
+
+
+def _sleep(segment: Segment) -> tuple[str, bool] | None:
+    return (SLEEP_MESSAGE, True) if segment_starts_with_sleep(segment.text) else None
+
+
+RULES = [
+    GuardRule(
+        "git-blocked-pattern",
+        "git",
+        lambda s: check_blocked_patterns(s.text),
+        keywords=("git", "gh"),
+    ),
+    GuardRule(
+        "git-protected-push", "git", _protected_push, phase="branch", keywords=("git",)
+    ),
+    GuardRule("sleep", "sleep", _sleep, keywords=("sleep",)),
+]
+
+RULE_SETS = frozenset(rule.rule_set for rule in RULES)
+
+
+def evaluate(
+    command: str,
+    cwd: str | None = None,
+    rule_sets: Iterable[str] | None = None,
+    timings: dict[str, float] | None = None,
+) -> Decision | None:
+    """Check a command against the registered rules (all sets by default).
+
+    If timings is given, seconds spent parsing and in each rule phase are
+    added to it.
+    """
+    selected = RULE_SETS if rule_sets is None else frozenset(rule_sets)
+    rules = [rule for rule in RULES if rule.rule_set in selected]
+    spent = timings if timings is not None else {}
+    start = perf_counter()
+    segments = parse_segments(command)
+    spent["parse"] = spent.get("parse", 0.0) + perf_counter() - start
+    first_overridable: Decision | None = None
+    for text in segments:
+        segment = Segment(text=text, command=command, cwd=cwd)
+        for rule in rules:
+            start = perf_counter()
+            result = rule.check(segment)
+            spent[rule.phase] = spent.get(rule.phase, 0.0) + perf_counter() - start
+            if result is None:
+                continue
+            decision = Decision(rule.name, *result)
+            if not decision.overridable:
+                return decision
+            first_overridable = first_overridable or decision
+            break
+    return first_overridable
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Long-lived guard daemon for the Bash PreToolUse hooks.
+
+Every hook invocation used to start a fresh interpreter that re-imported
+git_guard and recompiled its regexes. This daemon loads the rule modules once
+and answers checks over a unix socket; the adapters talk to it through
+guard_client.py, which starts it on demand and falls back to checking
+in-process while it is down.
+
+Protocol: one JSON request line {"command": ..., "cwd": ..., "rule_sets":
+[...] | null, "tool": ..., "env": {GIT_* variables}} per connection, answered
+with one JSON line {"decision": {"rule": ..., "message": ..., "overridable":
+...} | null} from guard_rules.evaluate, memoized by guard_cache, run with the
+client's GIT_* variables in place of the daemon's. Requests are handled
+sequentially; each is microseconds. Each request is then appended to the
+decision trace (guard_trace.py).
+
+The daemon exits after IDLE_TIMEOUT seconds without requests, and as soon as
+one of the rule modules changes on disk so edits take effect immediately. On
+start it re-exports the shared rule artifact if that is missing or stale.
+"""
+
+import json
+import os
+import socket
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+import guard_artifact
+from guard_client import socket_path
+from git_guard import has_override
+from guard_cache import evaluate
+from guard_trace import record
+
+IDLE_TIMEOUT = 15 * 60
+
+# The daemon serves whatever rules it imported; restart when these change.
+SOURCES = [
+    HERE / name
+    for name in (
+        "git_guard.py",
+        "git_head.py",
+        "sleep_guard.py",
+        "guard_rules.py",
+        "guard_artifact.py",
+        "guard_cache.py",
+        "guard_client.py",
+        "guard_server.py",
+        "guard_trace.py",
+    )
+]
+
+
+def source_stamp() -> list[int]:
+    """Modification times of the rule modules, to detect edits."""
+    stamp = []
+    for path in SOURCES:
+        try:
+            stamp.append(path.stat().st_mtime_ns)
+        except OSError:
+            stamp.append(0)
+    return stamp
+
+
+def bind(path: str) -> socket.socket | None:
+    """Bind the listening socket, or return None if a daemon already runs."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    except OSError:
+        # Either a live daemon owns the socket or a crashed one left it behind.
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            server.bind(path)
+        else:
+            server.close()
+            return None
+        finally:
+            probe.close()
+    os.chmod(path, 0o600)
+    server.listen(16)
+    return server
+
+
+def use_environment(environment: dict[str, str]) -> None:
+    """Replace this process's GIT_* variables with a client's.
+
+    The daemon inherits the environment of whichever hook started it, but a
+    push goes wherever the calling shell's GIT_DIR points.
+    """
+    for name in [name for name in os.environ if name.startswith("GIT_")]:
+        if name not in environment:
+            del os.environ[name]
+    os.environ.update(
+        {name: value for name, value in environment.items() if name.startswith("GIT_")}
+    )
+
+
+def handle(connection: socket.socket) -> None:
+    """Answer a single request on an accepted connection, then trace it."""
+    timings: dict[str, float] = {}
+    with connection, connection.makefile("rwb") as stream:
+        request = json.loads(stream.readline())
+        command = request["command"]
+        use_environment(request.get("env", {}))
+        decision = evaluate(
+            command, request.get("cwd"), request.get("rule_sets"), timings
+        )
+        response = {"decision": asdict(decision) if decision else None}
+        stream.write(json.dumps(response).encode() + b"\n")
+    # The client already has its answer; tracing is off the critical path.
+    tool = request.get("tool", "unknown")
+    record(tool, response["decision"], has_override(command), timings)
+
+
+def serve() -> None:
+    path = socket_path()
+    server = bind(path)
+    if server is None:
+        return
+    inode = os.stat(path).st_ino
+    stamp = source_stamp()
+    if guard_artifact.load() is None:
+        guard_artifact.write()
+    server.settimeout(IDLE_TIMEOUT)
+    try:
+        while True:
+            try:
+                connection, _ = server.accept()
+            except TimeoutError:
+                return
+            if source_stamp() != stamp:
+                # Drop the request unanswered; the client falls back in-process
+                # and starts a daemon with the new rules.
+                connection.close()
+                return
+            connection.settimeout(1)
+            try:
+                handle(connection)
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+    finally:
+        server.close()
+        try:
+            # A replacement daemon may already own the path; leave its socket.
+            if os.stat(path).st_ino == inode:
+                os.unlink(path)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Decision trace for the Bash guard hooks, and a summarizer for it.
+
+Every adapter invocation appends one compact JSON line to
+$XDG_CACHE_HOME/agent-guard/trace.jsonl: timestamp, tool, matched rule,
+decision (allow/block/override), whether the override marker was present,
+and microseconds spent per phase (prefilter, parse, match, branch lookup,
+cache).
+When the daemon answers, it writes the record after sending its response,
+off the hook's critical path. On the in-process fallback it is written at
+interpreter exit, after the adapter's decision has been flushed; the agent
+still waits for that exit, so importing this module and appending the
+record (about 0.3 ms, measured) add to the hook's latency there.
+Commands the prefilter lets through are traced by guard_client itself, at
+exit in the same way, with one append and without importing this module.
+The file rotates to trace.jsonl.1 at MAX_TRACE_BYTES.
+
+Run directly to print per-rule hit counts and latency percentiles:
+    python3 ~/.claude/hooks/guard_trace.py
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+MAX_TRACE_BYTES = 1024 * 1024
+PHASES = ("prefilter", "parse", "match", "branch", "cache")
+
+
+def trace_path() -> Path:
+    root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return root / "agent-guard" / "trace.jsonl"
+
+
+def record(
+    tool: str,
+    decision: dict | None,
+    override: bool,
+    timings: dict[str, float],
+) -> None:
+    """Append one trace record; failures are ignored."""
+    if decision is None:
+        outcome = "allow"
+    elif decision["overridable"] and override:
+        outcome = "override"
+    else:
+        outcome = "block"
+    entry = {
+        "ts": round(time.time(), 3),
+        "tool": tool,
+        "rule": decision["rule"] if decision else None,
+        "decision": outcome,
+        "override": override,
+        "us": {phase: round(seconds * 1e6, 1) for phase, seconds in timings.items()},
+    }
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+    path = trace_path()
+    try:
+        if path.stat().st_size > MAX_TRACE_BYTES:
+            path.replace(path.with_name(path.name + ".1"))
+    except OSError:
+        pass
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A single O_APPEND write keeps concurrent writers' lines intact.
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def read_entries() -> list[dict]:
+    path = trace_path()
+    entries = []
+    for candidate in (path.with_name(path.name + ".1"), path):
+        try:
+            lines = candidate.read_text().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(entries: list[dict]) -> str:
+    """Per-rule hit counts and per-phase latency percentiles."""
+    if not entries:
+        return f"No trace records in {trace_path()}"
+    lines = [
+        f"{len(entries)} guard invocations",
+        "",
+        f"{'rule':<22} {'allow':>7} {'block':>7} {'override':>9}",
+    ]
+    counts: dict[str, dict[str, int]] = {}
+    for entry in entries:
+        rule = entry.get("rule") or "(none)"
+        by_outcome = counts.setdefault(rule, {"allow": 0, "block": 0, "override": 0})
+        by_outcome[entry.get("decision", "allow")] += 1
+    for rule, by_outcome in sorted(counts.items(), key=lambda item: -sum(item[1].values())):
+        lines.append(
+            f"{rule:<22} {by_outcome['allow']:>7} {by_outcome['block']:>7} {by_outcome['override']:>9}"
+        )
+
+    lines += ["", f"{'phase (us)':<22} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"]
+    for phase in PHASES:
+        values = [entry["us"][phase] for entry in entries if phase in entry.get("us", {})]
+        if values:
+            lines.append(
+                f"{phase:<22} {percentile(values, 0.5):>9.1f} {percentile(values, 0.9):>9.1f} "
+                f"{percentile(values, 0.99):>9.1f} {max(values):>9.1f}"
+            )
+    totals = [sum(entry.get("us", {}).values()) for entry in entries]
+    lines.append(
+        f"{'total':<22} {percentile(totals, 0.5):>9.1f} {percentile(totals, 0.9):>9.1f} "
+        f"{percentile(totals, 0.99):>9.1f} {max(totals):>9.1f}"
+    )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(summarize(read_entries()))
@@ -1,5 +1,4 @@
-#!/usr/bin/env python3
-"""PreToolUse hook that blocks shell commands leading with `sleep`.
+"""Detection logic for the leading-sleep guard rule (see guard_rules.py).
 
 Agents reach for `sleep 240; check-if-done` to wait on a background job, the
 guessed duration is almost always a large overshoot, and the wait is
@@ -10,25 +9,13 @@ Only the leading token of each command in a chain is checked, and quoted
 strings are stripped first, so `sleep` inside a script being written, a commit
 message, or `python -c "time.sleep(1)"` is left alone.
 
-Protocol: exit 0 = allow, exit 2 = block with stderr. The override marker
-lifts the block directly (honor system: the agent must only use it after
-explicit user approval in conversation).
-
-Shell parsing helpers come from git_guard, the other Bash guard in this dir.
+Lives next to git_guard.py so the guard daemon (guard_server.py) can load both
+rule sets once; shell parsing helpers come from git_guard.
 """
 
-import json
 import re
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).resolve().parent))
-from git_guard import (
-    has_override,
-    override_hint,
-    split_shell_commands,
-    strip_quoted_strings,
-)
+
+from git_guard import split_shell_commands, strip_quoted_strings
 
 MESSAGE = (
     "sleep is not allowed - the duration is a guess and overshoots by a lot. "
@@ -72,26 +59,12 @@ def starts_with_sleep(command: str) -> bool:
     )
 
 
-def main() -> None:
-    try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    tool_name = input_data.get("tool_name", "")
-    command = input_data.get("tool_input", {}).get("command", "")
-
-    # Only check Bash commands
-    if tool_name != "Bash" or not command:
-        sys.exit(0)
-
-    if starts_with_sleep(command) and not has_override(command):
-        print(f"Blocked: {MESSAGE}{override_hint()}", file=sys.stderr)
-        sys.exit(2)
+def segment_starts_with_sleep(segment: str) -> bool:
+    """Check one already-split segment, including commands it backgrounds.
 
-    sys.exit(0)
-
-
-if __name__ == "__main__":
-    main()
+    Equivalent to starts_with_sleep on a segment from git_guard's parse, which
+    splits on && || ; | but not on a lone &.
+    """
+    return any(
+        leading_command(part) == "sleep" for part in _BACKGROUND.split(segment)
+    )
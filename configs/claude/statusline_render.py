@@ -0,0 +1,1050 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import sys
+import os
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# git_head lives with the hooks (~/.claude/hooks, next to this file's target).
+sys.path.insert(0, str(Path(__file__).resolve().parent / "hooks"))
+
+
+@dataclass
+class Model:
+    id: str
+    display_name: str
+
+
+@dataclass
+class Workspace:
+    current_dir: str
+    project_dir: str
+
+
+@dataclass
+class CurrentUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
+@dataclass
+class ContextWindow:
+    total_input_tokens: int = 0
+    total_output_tokens: int = 0
+    context_window_size: int = 0
+    current_usage: CurrentUsage | None = None
+
+
+@dataclass
+class Cost:
+    total_cost_usd: float
+    total_duration_ms: int
+    total_api_duration_ms: int
+    total_lines_added: int
+    total_lines_removed: int
+
+
+@dataclass
+class OutputStyle:
+    name: str
+
+
+@dataclass
+class StatusInput:
+    session_id: str
+    transcript_path: str
+    cwd: str
+    model: Model
+    workspace: Workspace
+    version: str
+    output_style: OutputStyle
+    cost: Cost
+    exceeds_200k_tokens: bool
+    context_window: ContextWindow | None = None
+    effort_level: str = ""
+
+
+def parse_input(raw: dict) -> StatusInput:
+    # Only pick the fields we use: the JSON schema gains new keys over time,
+    # and strict **-unpacking into dataclasses breaks on every addition.
+    ctx_data = raw.get("context_window", {})
+    current_usage = None
+    usage_data = ctx_data.get("current_usage")
+    if usage_data:
+        current_usage = CurrentUsage(
+            input_tokens=usage_data.get("input_tokens", 0),
+            output_tokens=usage_data.get("output_tokens", 0),
+            cache_creation_input_tokens=usage_data.get(
+                "cache_creation_input_tokens", 0
+            ),
+            cache_read_input_tokens=usage_data.get("cache_read_input_tokens", 0),
+        )
+
+    context_window = (
+        ContextWindow(
+            total_input_tokens=ctx_data.get("total_input_tokens", 0),
+            total_output_tokens=ctx_data.get("total_output_tokens", 0),
+            context_window_size=ctx_data.get("context_window_size", 0),
+            current_usage=current_usage,
+        )
+        if ctx_data
+        else None
+    )
+
+    model_data = raw.get("model", {})
+    workspace_data = raw.get("workspace", {})
+    cost_data = raw.get("cost", {})
+    cwd = raw.get("cwd", os.getcwd())
+
+    return StatusInput(
+        session_id=raw.get("session_id", ""),
+        transcript_path=raw.get("transcript_path", ""),
+        cwd=cwd,
+        model=Model(
+            id=model_data.get("id", ""),
+            display_name=model_data.get("display_name", ""),
+        ),
+        workspace=Workspace(
+            current_dir=workspace_data.get("current_dir", cwd),
+            project_dir=workspace_data.get("project_dir", cwd),
+        ),
+        version=raw.get("version", ""),
+        output_style=OutputStyle(name=raw.get("output_style", {}).get("name", "")),
+        cost=Cost(
+            total_cost_usd=cost_data.get("total_cost_usd", 0.0),
+            total_duration_ms=cost_data.get("total_duration_ms", 0),
+            total_api_duration_ms=cost_data.get("total_api_duration_ms", 0),
+            total_lines_added=cost_data.get("total_lines_added", 0),
+            total_lines_removed=cost_data.get("total_lines_removed", 0),
+        ),
+        exceeds_200k_tokens=raw.get("exceeds_200k_tokens", False),
+        context_window=context_window,
+        effort_level=(raw.get("effort") or {}).get("level", ""),
+    )
+
+
+@dataclass
+class GitInfo:
+    worktree: str  # what `git rev-parse --show-toplevel` prints ("" inside .git)
+    git_dir: str
+    branch: str  # "" when detached
+    head: list[int]  # (inode, mtime, size) of HEAD
+    ref: list[int] | None  # ... and of the file holding the branch ref
+
+
+def cache_dir() -> Path:
+    root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return root / "claude-statusline"
+
+
+def file_stamp(path: str) -> list[int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+
+
+def ref_path(git_dir: str, branch: str) -> str:
+    """Loose ref file of branch, or packed-refs if it only exists there."""
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir")) as f:
+            common_dir = os.path.join(git_dir, f.read().strip())
+    except OSError:
+        pass
+    loose = os.path.join(common_dir, "refs", "heads", branch)
+    return loose if os.path.exists(loose) else os.path.join(common_dir, "packed-refs")
+
+
+def read_git_info(project_dir: str) -> GitInfo | None:
+    """Resolve the repository from its files; git itself only for odd setups."""
+    from git_head import find_repository, head_branch
+
+    path = os.path.realpath(project_dir)  # git reports physical paths
+    repository = find_repository(path)
+    if repository is None:
+        # Only an environment override can make git see a repository here.
+        if "GIT_DIR" in os.environ or "GIT_WORK_TREE" in os.environ:
+            return git_info_from_git(project_dir)
+        return None
+    git_dir = repository.git_dir
+    head = file_stamp(os.path.join(git_dir, "HEAD"))
+    branch = head_branch(git_dir)
+    if head is None or branch is None:
+        return git_info_from_git(project_dir)
+    ref = file_stamp(ref_path(git_dir, branch)) if branch else None
+    worktree = os.path.realpath(repository.worktree)
+    if path == git_dir or path.startswith(git_dir + os.sep):
+        worktree = ""  # inside .git: a repository, but not a work tree
+    return GitInfo(worktree, git_dir, branch, head, ref)
+
+
+def git_info_from_git(project_dir: str) -> GitInfo | None:
+    """Ask git (GIT_DIR in the environment, reftable, ...); never cached."""
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["git", "-C", project_dir, "rev-parse", "--show-toplevel"],
+            capture_output=True,
+            text=True,
+            timeout=1,
+        )
+        worktree = result.stdout.strip() if result.returncode == 0 else ""
+        result = subprocess.run(
+            ["git", "-C", project_dir, "branch", "--show-current"],
+            capture_output=True,
+            text=True,
+            timeout=1,
+        )
+        branch = result.stdout.strip() if result.returncode == 0 else ""
+    except Exception:
+        return None
+    if not worktree and not branch:
+        return None
+    return GitInfo(worktree, "", branch, [], None)
+
+
+def git_info(project_dir: str) -> GitInfo | None:
+    """Git segment for project_dir, cached until HEAD or its ref changes."""
+    path = cache_dir() / "git" / f"{zlib.crc32(project_dir.encode()):08x}.json"
+    try:
+        cached = json.loads(path.read_text())
+        if cached.pop("project_dir") == project_dir:
+            info = GitInfo(**cached)
+            ref = ref_path(info.git_dir, info.branch) if info.branch else None
+            if file_stamp(os.path.join(info.git_dir, "HEAD")) == info.head and (
+                ref is None or file_stamp(ref) == info.ref
+            ):
+                return info
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+    info = read_git_info(project_dir)
+    if info is not None and info.git_dir:
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps({"project_dir": project_dir, **asdict(info)}))
+            temporary.replace(path)
+        except OSError:
+            pass
+    return info
+
+
+# Seconds before the rich git status is recomputed in the background, and
+# before a background refresher that never finished is presumed dead.
+STATUS_TTL = 10
+REFRESH_LOCK_TIMEOUT = 60
+
+
+@dataclass
+class GitStatus:
+    staged: int = 0
+    modified: int = 0
+    untracked: int = 0
+    ahead: int = 0
+    behind: int = 0
+    stash: int = 0
+
+
+def status_path(worktree: str) -> Path:
+    return cache_dir() / "status" / f"{zlib.crc32(worktree.encode()):08x}.json"
+
+
+def read_git_status(worktree: str, git_dir: str) -> GitStatus | None:
+    """Last status the refresher computed, possibly stale; never runs git.
+
+    Schedules a background refresh when the value is older than STATUS_TTL
+    or the index changed since it was computed.
+    """
+    path = status_path(worktree)
+    status, updated = None, 0.0
+    try:
+        cached = json.loads(path.read_text())
+        if cached.pop("worktree") == worktree:
+            updated = cached.pop("updated")
+            status = GitStatus(**cached)
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+    stale = time.time() - updated > STATUS_TTL
+    if not stale and git_dir:
+        index = file_stamp(os.path.join(git_dir, "index"))
+        stale = index is not None and index[1] > updated * 1e9
+    if stale:
+        spawn_status_refresh(worktree, path)
+    return status
+
+
+def take_lock(lock: Path) -> bool:
+    """Claim a refresher lock file, unless a live refresher holds it."""
+    try:
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            if time.time() - lock.stat().st_mtime < REFRESH_LOCK_TIMEOUT:
+                return False
+            lock.touch()  # take over from a refresher that died
+    except OSError:
+        return False
+    return True
+
+
+def spawn_refresher(args: list[str], input_text: str | None = None) -> None:
+    """Run this script again, detached, with the given arguments."""
+    import subprocess
+
+    try:
+        process = subprocess.Popen(
+            [sys.executable, __file__, *args],
+            stdin=subprocess.DEVNULL if input_text is None else subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            text=True,
+        )
+        if input_text is not None:
+            process.stdin.write(input_text)
+            process.stdin.close()
+    except OSError:
+        pass
+
+
+def spawn_status_refresh(worktree: str, path: Path) -> None:
+    """Start a detached status refresher unless one is already running."""
+    if take_lock(path.with_suffix(".lock")):
+        spawn_refresher(["--refresh-status", worktree, str(path)])
+
+
+def parse_git_status(porcelain: str) -> GitStatus:
+    """Count `git status --porcelain=v2 --branch --show-stash` output."""
+    status = GitStatus()
+    for line in porcelain.splitlines():
+        if line.startswith("# branch.ab "):
+            ahead, behind = line.split()[2:4]
+            status.ahead, status.behind = int(ahead), -int(behind)
+        elif line.startswith("# stash "):
+            status.stash = int(line.split()[2])
+        elif line.startswith(("1 ", "2 ")):
+            status.staged += line[2] != "."
+            status.modified += line[3] != "."
+        elif line.startswith("u "):
+            status.modified += 1
+        elif line.startswith("? "):
+            status.untracked += 1
+    return status
+
+
+def refresh_git_status(worktree: str, path_name: str) -> None:
+    """Background refresher: run git status once and cache the counts."""
+    import subprocess
+
+    path = Path(path_name)
+    started = time.time()
+    try:
+        # Never take index.lock: the user's own git commands must not fail
+        # because the statusline happened to be refreshing.
+        command = ["git", "--no-optional-locks", "-C", worktree]
+        # The repository's own core.fsmonitor and core.untrackedCache speed
+        # this up where configured; the statusline never turns them on, since
+        # core.fsmonitor=true leaves a daemon running in every repo visited.
+        result = subprocess.run(
+            command + ["status", "--porcelain=v2", "--branch", "--show-stash"],
+            capture_output=True,
+            text=True,
+            errors="surrogateescape",
+            timeout=30,
+        )
+        if result.returncode == 0:
+            status = parse_git_status(result.stdout)
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(
+                json.dumps({"worktree": worktree, "updated": started, **asdict(status)})
+            )
+            temporary.replace(path)
+    except (OSError, subprocess.SubprocessError, ValueError):
+        pass
+    finally:
+        try:
+            path.with_suffix(".lock").unlink()
+        except OSError:
+            pass
+
+
+# Set to capture every input to a per-session ring buffer (see capture_input)
+# and each render's segment timings (see record_timings); off, nothing is
+# written per render.
+CAPTURE_ENV = "CLAUDE_STATUSLINE_CAPTURE"
+CAPTURE_MAX_BYTES = 256 * 1024
+
+
+def capture_path(session_id: str) -> Path:
+    name = "".join(c for c in session_id if c.isalnum() or c in "-_") or "unknown"
+    return cache_dir() / "capture" / f"{name}.jsonl"
+
+
+def capture_input(raw: dict, session_id: str) -> None:
+    """Append the input as one JSON line, keeping the file under the cap.
+
+    Once the file exceeds CAPTURE_MAX_BYTES the oldest lines are dropped
+    down to half of it. Each line is a complete statusline input, so the
+    directory doubles as a replay corpus (`statusline.py < line`).
+    """
+    append_bounded(capture_path(session_id), raw, CAPTURE_MAX_BYTES)
+
+
+def append_bounded(path: Path, record: dict, max_bytes: int) -> None:
+    """Append one JSON line; past max_bytes, drop the oldest to half of it."""
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > max_bytes:
+            kept = path.read_bytes()[-max_bytes // 2 :]
+            kept = kept[kept.find(b"\n") + 1 :]
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_bytes(kept)
+            temporary.replace(path)
+    except OSError:
+        pass
+
+
+# Transcript tailing: how much of an unseen transcript to read on first sight,
+# and the window the tool-call rate is averaged over.
+TRANSCRIPT_START_BYTES = 256 * 1024
+TOOL_RATE_WINDOW = 600
+
+
+@dataclass
+class TranscriptStats:
+    """Metrics folded from the transcript up to offset (see tail_transcript)."""
+
+    inode: int = 0
+    offset: int = 0
+    first: float = 0.0  # timestamp of the first entry seen
+    last_input: float = 0.0  # last user prompt or tool result
+    turn_start: float = 0.0  # last user prompt
+    turn_end: float = 0.0  # last assistant entry after it
+    new_turn: bool = False  # prompt seen, no assistant output since
+    message_id: str = ""
+    message_start: float = 0.0
+    message_tokens: int = 0
+    turn_tokens: int = 0  # output tokens of finished messages this turn
+    turn_seconds: float = 0.0  # ... and the time spent generating them
+    tool_calls: list[float] | None = None  # timestamps within TOOL_RATE_WINDOW
+
+    def tokens_per_second(self) -> float:
+        if self.new_turn:
+            return 0.0
+        seconds = self.turn_seconds + max(self.turn_end - self.message_start, 0.0)
+        tokens = self.turn_tokens + self.message_tokens
+        return tokens / seconds if seconds > 0 else 0.0
+
+    def turn_latency(self) -> float:
+        return max(self.turn_end - self.turn_start, 0.0) if self.turn_start else 0.0
+
+    def tool_rate(self) -> float:
+        """Tool calls per minute over the window (or the session, if shorter)."""
+        calls = self.tool_calls or []
+        if not calls:
+            return 0.0
+        span = min(max(calls[-1] - self.first, 60.0), TOOL_RATE_WINDOW)
+        return len(calls) * 60 / span
+
+
+def parse_timestamp(value: str) -> float:
+    from datetime import datetime
+
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def fold_entry(stats: TranscriptStats, entry: dict) -> None:
+    """Update the metrics with one transcript line."""
+    kind = entry.get("type")
+    if kind not in ("user", "assistant") or entry.get("isSidechain"):
+        return
+    timestamp = parse_timestamp(entry["timestamp"])
+    stats.first = stats.first or timestamp
+    message = entry.get("message") or {}
+    content = message.get("content")
+    blocks = content if isinstance(content, list) else []
+    if kind == "user":
+        if entry.get("isMeta"):
+            return
+        stats.last_input = timestamp
+        if not any(block.get("type") == "tool_result" for block in blocks):
+            stats.turn_start, stats.turn_end, stats.new_turn = timestamp, timestamp, True
+        return
+
+    # Assistant messages are split over several lines sharing one id, each
+    # repeating the message's usage.
+    if message.get("id") != stats.message_id:
+        if stats.new_turn:
+            stats.turn_tokens, stats.turn_seconds, stats.new_turn = 0, 0.0, False
+        elif stats.message_id:
+            stats.turn_tokens += stats.message_tokens
+            stats.turn_seconds += max(stats.turn_end - stats.message_start, 0.0)
+        stats.message_id = message.get("id", "")
+        stats.message_start = stats.last_input or timestamp
+    stats.message_tokens = (message.get("usage") or {}).get("output_tokens", 0)
+    stats.turn_end = timestamp
+    calls = [t for t in stats.tool_calls or [] if t > timestamp - TOOL_RATE_WINDOW]
+    calls += [timestamp for block in blocks if block.get("type") == "tool_use"]
+    stats.tool_calls = calls
+
+
+def tail_transcript(transcript_path: str, session_id: str) -> TranscriptStats | None:
+    """Fold the transcript lines appended since the last render.
+
+    The byte offset and running metrics are checkpointed per session, so a
+    render only reads the new tail. An unseen transcript is read from its
+    last TRANSCRIPT_START_BYTES; one that was replaced or truncated starts
+    over the same way.
+    """
+    try:
+        handle = open(transcript_path, "rb")
+    except OSError:
+        return None
+    path = cache_dir() / "transcript" / f"{capture_path(session_id).stem}.json"
+    with handle:
+        stat = os.fstat(handle.fileno())
+        try:
+            stats = TranscriptStats(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            stats = TranscriptStats()
+        if stats.inode != stat.st_ino or stats.offset > stat.st_size:
+            stats = TranscriptStats(inode=stat.st_ino)
+            stats.offset = max(stat.st_size - TRANSCRIPT_START_BYTES, 0)
+            if stats.offset:
+                handle.seek(stats.offset - 1)
+                stats.offset += len(handle.readline()) - 1  # to a line start
+        if stats.offset == stat.st_size:
+            return stats
+        handle.seek(stats.offset)
+        chunk = handle.read(stat.st_size - stats.offset)
+    complete = chunk[: chunk.rfind(b"\n") + 1]  # a partial last line waits
+    for line in complete.splitlines():
+        try:
+            fold_entry(stats, json.loads(line))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    stats.offset += len(complete)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary.write_text(json.dumps(asdict(stats)))
+        temporary.replace(path)
+    except OSError:
+        pass
+    return stats
+
+
+# Host-wide burn rate: a fixed-slot table shared by every session's renders.
+FLEET_SLOTS = 64
+FLEET_DEAD_AFTER = 600  # seconds without a render before a slot is reused
+FLEET_WINDOW = 900  # rates span the last FLEET_WINDOW / 2 to FLEET_WINDOW
+FLEET_HEADER = b"CSLFLT\x00\x01"
+# session id, last render, cost, tokens, and two (time, cost, tokens) anchors
+FLEET_SLOT = "<40sddqddqddq"
+
+
+@dataclass
+class FleetRates:
+    dollars_per_hour: float = 0.0
+    tokens_per_minute: float = 0.0
+    sessions: int = 0
+
+
+def update_fleet(session_id: str, cost: float, tokens: int) -> FleetRates | None:
+    """Record this session's totals and sum the rates of all live sessions.
+
+    The table is a small memory-mapped file under flock. A session finds its
+    slot by hashing its id (linear probing); a new session takes the first
+    empty slot or one whose session has not rendered for FLEET_DEAD_AFTER.
+    Each slot keeps two anchors that leapfrog every FLEET_WINDOW / 2, so a
+    rate never needs history beyond one slot.
+    """
+    import fcntl
+    import mmap
+    import struct
+
+    slot = struct.Struct(FLEET_SLOT)
+    size = len(FLEET_HEADER) + FLEET_SLOTS * slot.size
+    path = cache_dir() / "fleet.bin"
+    key = session_id.encode()[:40]
+    now = time.time()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        header = os.pread(fd, len(FLEET_HEADER), 0)
+        if os.fstat(fd).st_size != size or header != FLEET_HEADER:
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, size)
+            os.pwrite(fd, FLEET_HEADER, 0)
+        with mmap.mmap(fd, size) as table:
+            offsets = [len(FLEET_HEADER) + i * slot.size for i in range(FLEET_SLOTS)]
+            start = zlib.crc32(key) % FLEET_SLOTS
+            mine = free = None
+            for offset in offsets[start:] + offsets[:start]:
+                stored, last = slot.unpack_from(table, offset)[:2]
+                if stored.rstrip(b"\0") == key:
+                    mine = offset
+                    break
+                dead = not stored.strip(b"\0") or now - last > FLEET_DEAD_AFTER
+                if free is None and dead:
+                    free = offset
+            if key and (mine is not None or free is not None):
+                fields = slot.unpack_from(table, mine) if mine is not None else None
+                if fields is None or cost < fields[2]:  # new or restarted session
+                    anchors = (now, cost, tokens) * 2
+                elif now - fields[7] >= FLEET_WINDOW / 2:
+                    anchors = (*fields[7:10], now, cost, tokens)
+                else:
+                    anchors = fields[4:10]
+                target = free if mine is None else mine
+                slot.pack_into(table, target, key, now, cost, tokens, *anchors)
+
+            rates = FleetRates()
+            for offset in offsets:
+                stored, last, cost_now, tokens_now, since, cost_then, tokens_then = (
+                    slot.unpack_from(table, offset)[:7]
+                )
+                if not stored.strip(b"\0") or now - last > FLEET_DEAD_AFTER:
+                    continue
+                rates.sessions += 1
+                if last - since >= 60:
+                    rates.dollars_per_hour += (cost_now - cost_then) * 3600 / (last - since)
+                    rates.tokens_per_minute += (tokens_now - tokens_then) * 60 / (last - since)
+            return rates
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+
+
+# Colors
+CYAN = "\033[36m"
+GREEN = "\033[32m"
+YELLOW = "\033[33m"
+MAGENTA = "\033[35m"
+BLUE = "\033[34m"
+RED = "\033[31m"
+RESET = "\033[0m"
+
+# Icons (Nerd Font)
+ICON_GIT = "\uf1d3"
+ICON_SERVER = "\uf233"
+ICON_FOLDER = "\uf07b"
+ICON_CHART = "\uf080"
+ICON_COST = "\uf155"  # dollar sign
+ICON_GOOGLE = "\uf1a0"
+ICON_BRAIN = "\U000f09d1"  # nf-md-brain
+ICON_SPEED = "\uf0e4"  # tachometer
+
+# Thinking effort level
+EFFORT_COLORS = {
+    "low": GREEN,
+    "medium": CYAN,
+    "high": YELLOW,
+    "xhigh": MAGENTA,
+    "max": RED,
+}
+
+
+def model_segment(data: StatusInput) -> str:
+    # Model icon
+    if "fable" in data.model.id.lower():
+        model_icon = f"{BLUE}{RESET}"  # book, fitting for Fable
+    elif "opus" in data.model.id.lower():
+        model_icon = f"{MAGENTA}󰘨{RESET}"
+    elif "sonnet" in data.model.id.lower():
+        model_icon = f"{CYAN}󰎈{RESET}"
+    elif "haiku" in data.model.id.lower():
+        model_icon = f"{GREEN}󰯈{RESET}"
+    else:
+        model_icon = ""
+
+    # Check if using Vertex AI (Google)
+    provider_info = ""
+    if os.environ.get("CLAUDE_CODE_USE_VERTEX"):
+        provider_info = f"{YELLOW}{ICON_GOOGLE}{RESET}"
+
+    return f"{model_icon} {provider_info} " if (model_icon and provider_info) else f"{model_icon or provider_info} " if (model_icon or provider_info) else ""
+
+
+def effort_segment(data: StatusInput) -> str:
+    if not data.effort_level:
+        return ""
+    color = EFFORT_COLORS.get(data.effort_level, YELLOW)
+    return f"{color}{ICON_BRAIN} {data.effort_level}{RESET} "
+
+
+def git_segment(data: StatusInput) -> str:
+    """Project name, branch, rich status and the folders Claude is in."""
+    git = git_info(data.workspace.project_dir)
+    is_git_repo = bool(git and git.worktree)
+    git_root = git.worktree if is_git_repo else data.workspace.project_dir
+    repo_name = os.path.basename(git_root)
+    branch = "@" + git.branch if git and git.branch else ""
+    git_status = read_git_status(git.worktree, git.git_dir) if is_git_repo else None
+
+    status_info = ""
+    if git_status:
+        status_parts = [
+            f"{GREEN}+{git_status.staged}" if git_status.staged else "",
+            f"{YELLOW}!{git_status.modified}" if git_status.modified else "",
+            f"{BLUE}?{git_status.untracked}" if git_status.untracked else "",
+            f"{CYAN}⇡{git_status.ahead}" if git_status.ahead else "",
+            f"{RED}⇣{git_status.behind}" if git_status.behind else "",
+            f"{MAGENTA}*{git_status.stash}" if git_status.stash else "",
+        ]
+        if any(status_parts):
+            status_info = f" {' '.join(part for part in status_parts if part)}{RESET}"
+
+    # start_folder: where Claude was started (relative to git root)
+    # current_folder: where Claude cd'd to (relative to project_dir)
+    folder_parts = []
+    if data.workspace.project_dir != git_root:
+        folder_parts.append(os.path.relpath(data.workspace.project_dir, git_root))
+    if data.workspace.current_dir != data.workspace.project_dir:
+        current_folder = os.path.relpath(
+            data.workspace.current_dir, data.workspace.project_dir
+        )
+        folder_parts.append(current_folder)
+
+    folder_info = ""
+    if folder_parts:
+        folder_info = f" {YELLOW}{ICON_FOLDER} {' → '.join(folder_parts)}{RESET}"
+
+    project_icon = ICON_GIT if is_git_repo else ICON_FOLDER
+    return f"{CYAN}{project_icon} {repo_name}{branch}{RESET}{status_info}{folder_info}"
+
+
+def boot_id() -> str:
+    """Identify the current boot (kernel boot id, else the boot time)."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        # macOS: CLOCK_MONOTONIC keeps counting while asleep. Rounded to 10 s
+        # so clock adjustments do not look like a reboot.
+        booted = time.time() - time.clock_gettime(time.CLOCK_MONOTONIC)
+        return str(round(booted / 10))
+
+
+def detect_host() -> tuple[str, str]:
+    # Get hostname and OS icon
+    hostname = os.uname().nodename.split(".")[0]
+    if "macbook" in hostname.lower():
+        hostname = "macbook"
+
+    # Detect OS
+    os_icon = ""
+    if sys.platform == "darwin":
+        os_icon = "\uf179"  # Apple
+    elif sys.platform == "linux":
+        try:
+            with open("/etc/os-release") as f:
+                os_release = f.read().lower()
+            if "nixos" in os_release:
+                os_icon = "\uf313"  # NixOS
+            elif "debian" in os_release:
+                os_icon = "\uf306"  # Debian
+            else:
+                os_icon = "\uf17c"  # Generic Linux
+        except Exception:
+            os_icon = "\uf17c"  # Generic Linux
+    return hostname, os_icon
+
+
+def host_info() -> tuple[str, str]:
+    """Hostname and OS icon, detected once per boot."""
+    path = cache_dir() / "host.json"
+    boot = boot_id()
+    try:
+        cached = json.loads(path.read_text())
+        if cached["boot_id"] == boot:
+            return cached["hostname"], cached["os_icon"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    hostname, os_icon = detect_host()
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"boot_id": boot, "hostname": hostname, "os_icon": os_icon}
+        temporary.write_text(json.dumps(record))
+        temporary.replace(path)
+    except OSError:
+        pass
+    return hostname, os_icon
+
+
+def host_segment(data: StatusInput) -> str:
+    hostname, os_icon = host_info()
+    return f" {GREEN}{os_icon} {hostname}{RESET}"
+
+
+def context_segment(data: StatusInput) -> str:
+    if not data.context_window:
+        return ""
+    ctx = data.context_window
+    if ctx.current_usage:
+        tokens = (
+            ctx.current_usage.input_tokens
+            + ctx.current_usage.cache_creation_input_tokens
+            + ctx.current_usage.cache_read_input_tokens
+        )
+    else:
+        tokens = ctx.total_input_tokens + ctx.total_output_tokens
+
+    if tokens <= 0:
+        return ""
+    if tokens >= 1_000_000:
+        tok_str = f"{tokens / 1_000_000:.2f}M"
+    elif tokens >= 1_000:
+        tok_str = f"{tokens / 1_000:.0f}k"
+    else:
+        tok_str = str(tokens)
+    return f" {MAGENTA}{ICON_CHART} {tok_str}{RESET}"
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    return f"{int(seconds // 60)}m{int(seconds % 60):02d}s"
+
+
+def activity_segment(data: StatusInput) -> str:
+    """Output tokens/sec and latency of the latest turn, tool calls/min."""
+    if not data.transcript_path:
+        return ""
+    stats = tail_transcript(data.transcript_path, data.session_id)
+    if stats is None:
+        return ""
+    parts = []
+    # Nothing is generated yet for a new prompt; the prompt itself may lie
+    # before the tailed part of the transcript.
+    if stats.message_id and not stats.new_turn:
+        parts.append(f"{stats.tokens_per_second():.0f} tok/s")
+        if stats.turn_start:
+            parts.append(format_duration(stats.turn_latency()))
+    if stats.tool_calls:
+        parts.append(f"{stats.tool_rate():.1f} tools/min")
+    if not parts:
+        return ""
+    return f" {BLUE}{ICON_SPEED} {' '.join(parts)}{RESET}"
+
+
+def cost_segment(data: StatusInput) -> str:
+    if data.cost.total_cost_usd <= 0:
+        return ""
+    return f" {YELLOW}{ICON_COST}{data.cost.total_cost_usd:.2f}{RESET}"
+
+
+def fleet_segment(data: StatusInput) -> str:
+    """Burn rate of all live sessions on this host."""
+    ctx = data.context_window
+    tokens = ctx.total_input_tokens + ctx.total_output_tokens if ctx else 0
+    rates = update_fleet(data.session_id, data.cost.total_cost_usd, tokens)
+    if rates is None or rates.dollars_per_hour <= 0:
+        return ""
+    tpm = rates.tokens_per_minute
+    tpm_str = f"{tpm / 1_000:.1f}k" if tpm >= 1_000 else f"{tpm:.0f}"
+    return (
+        f" {CYAN}{ICON_SERVER} ${rates.dollars_per_hour:.2f}/h {tpm_str} tok/min"
+        f" ×{rates.sessions}{RESET}"
+    )
+
+
+# Rendered left to right; the names key the timings render() reports.
+SEGMENTS = {
+    "model": model_segment,
+    "effort": effort_segment,
+    "git": git_segment,
+    "host": host_segment,
+    "context": context_segment,
+    "activity": activity_segment,
+    "cost": cost_segment,
+    "fleet": fleet_segment,
+}
+
+
+# Seconds the segments that do I/O may take. One that overruns shows its last
+# value, marked stale, and is recomputed by a detached refresher; the others
+# only format the input and always run inline.
+SEGMENT_BUDGETS = {"git": 0.15, "host": 0.05, "activity": 0.1, "fleet": 0.05}
+TIMINGS_MAX_BYTES = 256 * 1024
+
+
+def segments_path(session_id: str) -> Path:
+    return cache_dir() / "segments" / f"{capture_path(session_id).stem}.json"
+
+
+def read_segments(session_id: str) -> dict[str, str]:
+    try:
+        return json.loads(segments_path(session_id).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def write_segments(session_id: str, outputs: dict[str, str]) -> None:
+    path = segments_path(session_id)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary.write_text(json.dumps(outputs))
+        temporary.replace(path)
+    except OSError:
+        pass
+
+
+def render(raw: dict, timings: dict[str, float] | None = None) -> str:
+    """The status line for one input.
+
+    Budgeted segments run concurrently in threads; a segment still running
+    at its deadline is replaced by its cached last output plus a stale mark
+    and refreshed in the background. If timings is given, seconds spent
+    parsing and in each segment (up to its deadline) are added to it.
+    """
+    import threading
+
+    spent = timings if timings is not None else {}
+    start = time.perf_counter()
+    data = parse_input(raw)
+    spent["parse"] = spent.get("parse", 0.0) + time.perf_counter() - start
+
+    finished: dict[str, tuple[str, float]] = {}
+
+    def run(name: str) -> None:
+        begin = time.perf_counter()
+        output = SEGMENTS[name](data)
+        finished[name] = (output, time.perf_counter() - begin)
+
+    started = time.perf_counter()
+    threads = {}
+    for name in SEGMENT_BUDGETS:
+        threads[name] = threading.Thread(target=run, args=(name,), daemon=True)
+        threads[name].start()
+
+    outputs = {}
+    for name, segment in SEGMENTS.items():
+        if name not in threads:
+            start = time.perf_counter()
+            outputs[name] = segment(data)
+            spent[name] = spent.get(name, 0.0) + time.perf_counter() - start
+
+    overrun = []
+    for name, thread in threads.items():
+        thread.join(max(started + SEGMENT_BUDGETS[name] - time.perf_counter(), 0.0))
+        if name in finished:
+            outputs[name], seconds = finished[name]
+        else:
+            overrun.append(name)
+            seconds = time.perf_counter() - started
+        spent[name] = spent.get(name, 0.0) + seconds
+
+    cached = read_segments(data.session_id)
+    fresh = {name: outputs[name] for name in threads if name not in overrun}
+    if any(cached.get(name) != output for name, output in fresh.items()):
+        write_segments(data.session_id, {**cached, **fresh})
+    for name in overrun:
+        outputs[name] = f"{cached[name]}{RED}~{RESET}" if cached.get(name) else ""
+    lock = segments_path(data.session_id).with_suffix(".lock")
+    if overrun and take_lock(lock):
+        spawn_refresher(["--refresh-segments", ",".join(overrun)], json.dumps(raw))
+    return "".join(outputs[name] for name in SEGMENTS)
+
+
+def refresh_segments(names: list[str], raw: dict) -> None:
+    """Background refresher: compute segments without a budget and cache them."""
+    data = parse_input(raw)
+    try:
+        fresh = {name: SEGMENTS[name](data) for name in names}
+        write_segments(data.session_id, {**read_segments(data.session_id), **fresh})
+    finally:
+        try:
+            segments_path(data.session_id).with_suffix(".lock").unlink()
+        except OSError:
+            pass
+
+
+def timings_path() -> Path:
+    return cache_dir() / "timings.jsonl"
+
+
+def record_timings(timings: dict[str, float]) -> None:
+    """Log one render's per-segment microseconds (bounded, like captures)."""
+    stale = [
+        name for name, budget in SEGMENT_BUDGETS.items() if timings.get(name, 0) >= budget
+    ]
+    record = {
+        "ts": round(time.time(), 3),
+        "us": {name: round(seconds * 1e6, 1) for name, seconds in timings.items()},
+        "stale": stale,
+    }
+    append_bounded(timings_path(), record, TIMINGS_MAX_BYTES)
+
+
+def summarize_timings() -> str:
+    """p50/p99/max per segment over the logged renders, and how often stale."""
+    try:
+        lines = timings_path().read_text().splitlines()
+    except OSError:
+        return f"No timings in {timings_path()}; set {CAPTURE_ENV}=1 to record"
+    records = [json.loads(line) for line in lines if line.strip()]
+    rows = [
+        f"{len(records)} renders",
+        "",
+        f"{'segment (us)':<14} {'p50':>9} {'p99':>9} {'max':>9} {'stale':>6}",
+    ]
+    for name in ["parse", *SEGMENTS]:
+        values = sorted(record["us"][name] for record in records if name in record["us"])
+        if not values:
+            continue
+        stale = sum(name in record["stale"] for record in records)
+        rows.append(
+            f"{name:<14} {values[len(values) // 2]:>9.1f} "
+            f"{values[min(len(values) - 1, int(0.99 * len(values)))]:>9.1f} "
+            f"{values[-1]:>9.1f} {stale:>6}"
+        )
+    return "\n".join(rows)
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--refresh-status"]:
+        refresh_git_status(sys.argv[2], sys.argv[3])
+        return
+    if sys.argv[1:2] == ["--refresh-segments"]:
+        refresh_segments(sys.argv[2].split(","), json.loads(sys.stdin.read()))
+        return
+    if sys.argv[1:2] == ["--timings"]:
+        print(summarize_timings())
+        return
+    raw = json.loads(sys.stdin.read())
+    capture = os.environ.get(CAPTURE_ENV, "0") != "0"
+    if capture:
+        capture_input(raw, raw.get("session_id", ""))
+    timings: dict[str, float] = {}
+    print(render(raw, timings), flush=True)
+    if capture:
+        record_timings(timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "claude" / "hooks"))
-from git_guard import check_command, has_override, override_hint
+from guard_client import check
 
 
 def deny(reason: str) -> None:
@@ -47,9 +47,12 @@ def main() -> None:
             allow()
             return
 
-        result = check_command(command)
+        result = check(command, rule_sets=["git"], tool="gemini")
         if result:
-            error, overridable = result
+            # Rules are only imported to report a block.
+            from git_guard import has_override, override_hint
+
+            error, overridable = result["message"], result["overridable"]
             if not (overridable and has_override(command)):
                 if overridable:
                     error += override_hint()
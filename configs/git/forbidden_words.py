@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
+import argparse
+import codecs
 import hashlib
+import io
 import json
 import os
+import re
+import sqlite3
 import subprocess
 import sys
 import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -16,6 +23,41 @@ RULES_REPOSITORY_PATH = "configs/git/forbidden-words"
 PRIVATE_VISIBILITIES = {"PRIVATE", "INTERNAL"}
 SKIP_VISIBILITIES = PRIVATE_VISIBILITIES | {"LOCAL"}
 KNOWN_VISIBILITIES = PRIVATE_VISIBILITIES | {"PUBLIC"}
+REFRESH_LOCK_TIMEOUT = 60
+# Repositories per GraphQL query when prefetching visibility.
+GRAPHQL_BATCH = 100
+MAX_DISCOVERY_DEPTH = 5
+PRUNED_DIRECTORIES = {
+    ".cache",
+    ".git",
+    ".local",
+    ".venv",
+    "__pycache__",
+    "build",
+    "dist",
+    "node_modules",
+    "target",
+    "venv",
+}
+MATCHER_VERSION = 2
+BLOB_CACHE_MAX_ENTRIES = 50_000
+# Refreshing the LRU timestamp is a write; skip it for entries used recently.
+BLOB_CACHE_TOUCH_INTERVAL = 60 * 60
+# Paths per diff when only some staged files need scanning.
+PATHSPEC_BATCH = 1000
+OUTCOME_CACHE_MAX_ENTRIES = 1000
+# Characters of added text casefolded and searched at a time.
+SCAN_CHUNK = 1 << 20
+DEFAULT_MAX_BLOB_SIZE = 32 << 20
+LARGE_BLOB_SAMPLE = 1 << 20
+LARGE_BLOB_POLICIES = {"sample", "skip"}
+# Git treats a blob as binary when this prefix contains a NUL byte.
+BINARY_CHECK_BYTES = 8000
+# Blob ids written to one `git cat-file --batch` at once (and the blobs per
+# audit work item); they must fit in a pipe buffer.
+BLOB_BATCH = 500
+GITLINK_MODE = "160000"
+_connection: sqlite3.Connection | None = None
 
 
 @dataclass(frozen=True)
@@ -24,6 +66,16 @@ class Rule:
     reason: str
 
 
+@dataclass(frozen=True)
+class Matcher:
+    rules: tuple[Rule, ...]
+    digest: str
+    pattern: re.Pattern[str]
+    # Casefolded word matched by the pattern -> every rule word inside it.
+    contained: dict[str, tuple[str, ...]]
+    longest: int
+
+
 @dataclass(frozen=True)
 class Violation:
     location: str
@@ -54,13 +106,16 @@ def cache_directory() -> Path:
     )
 
 
-def load_rules() -> list[Rule]:
-    rules: list[Rule] = []
-    paths = [
+def rule_paths() -> list[Path]:
+    return [
         config_directory() / "forbidden-words",
         config_directory() / "forbidden-words.private",
     ]
-    for path in paths:
+
+
+def load_rules() -> list[Rule]:
+    rules: list[Rule] = []
+    for path in rule_paths():
         if not path.exists():
             continue
         for line_number, raw_line in enumerate(path.read_text().splitlines(), start=1):
@@ -78,16 +133,173 @@ def load_rules() -> list[Rule]:
     return rules
 
 
-def remote_url() -> tuple[str | None, bool]:
-    origin = git("remote", "get-url", "origin")
+def trie_pattern(node: dict) -> str:
+    # Alternatives differ in their first character and an optional tail is
+    # greedy, so the pattern matches the longest word starting at a position.
+    alternatives = [
+        re.escape(character) + trie_pattern(child)
+        for character, child in sorted(node.items())
+        if character
+    ]
+    if not alternatives:
+        return ""
+    pattern = alternatives[0]
+    if len(alternatives) > 1:
+        pattern = f"(?:{'|'.join(alternatives)})"
+    return f"(?:{pattern})?" if "" in node else pattern
+
+
+def compile_rules(rules: list[Rule]) -> dict:
+    words = sorted({rule.word.casefold() for rule in rules})
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for character in word:
+            node = node.setdefault(character, {})
+        node[""] = {}
+    listed = [[rule.word, rule.reason] for rule in rules]
+    return {
+        "rules": listed,
+        "digest": hashlib.sha256(json.dumps(listed).encode()).hexdigest(),
+        "pattern": trie_pattern(trie) if words else "(?!)",
+        "contained": {
+            word: [other for other in words if other in word] for word in words
+        },
+    }
+
+
+def rule_stamps() -> dict[str, list[int] | None]:
+    stamps: dict[str, list[int] | None] = {}
+    for path in rule_paths():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            stamps[str(path)] = None
+            continue
+        stamps[str(path)] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def matcher_path() -> Path:
+    return cache_directory() / "matcher.json"
+
+
+def read_cached_matcher(path: Path, stamps: dict) -> dict | None:
+    try:
+        cached = json.loads(path.read_text())
+        if cached["version"] == MATCHER_VERSION and cached["stamps"] == stamps:
+            return cached["compiled"]
+    except (OSError, KeyError, TypeError, ValueError):
+        pass
+    return None
+
+
+def write_cached_matcher(path: Path, stamps: dict, compiled: dict) -> None:
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary.write_text(
+            json.dumps(
+                {"version": MATCHER_VERSION, "stamps": stamps, "compiled": compiled}
+            )
+        )
+        temporary.replace(path)
+    except OSError:
+        try:
+            temporary.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def load_matcher() -> Matcher:
+    path = matcher_path()
+    # Stamped before the rules are read: an edit in between only costs a
+    # rebuild on the next run.
+    stamps = rule_stamps()
+    compiled = read_cached_matcher(path, stamps)
+    if compiled is None:
+        compiled = compile_rules(load_rules())
+        write_cached_matcher(path, stamps, compiled)
+    return Matcher(
+        rules=tuple(
+            Rule(word=word, reason=reason) for word, reason in compiled["rules"]
+        ),
+        digest=compiled["digest"],
+        pattern=re.compile(compiled["pattern"]),
+        contained={
+            word: tuple(words) for word, words in compiled["contained"].items()
+        },
+        longest=max(map(len, compiled["contained"]), default=0),
+    )
+
+
+def matched_words(matcher: Matcher, text: str) -> set[str]:
+    return folded_matches(matcher, text.casefold())
+
+
+def folded_matches(matcher: Matcher, folded: str) -> set[str]:
+    words: set[str] = set()
+    # Resume right after each match start so overlapping words are found;
+    # between matches the regex engine scans in C.
+    match = matcher.pattern.search(folded)
+    while match is not None:
+        words.update(matcher.contained[match.group()])
+        match = matcher.pattern.search(folded, match.start() + 1)
+    return words
+
+
+def matching_rules(matcher: Matcher, *texts: str) -> list[Rule]:
+    words: set[str] = set()
+    for text in texts:
+        words |= matched_words(matcher, text)
+    return rules_for_words(matcher, words)
+
+
+def rules_for_words(matcher: Matcher, words: set[str]) -> list[Rule]:
+    return [rule for rule in matcher.rules if rule.word.casefold() in words]
+
+
+class ChunkedScan:
+    # Matches text fed in pieces, SCAN_CHUNK characters at a time. The last
+    # longest-1 characters of each chunk are searched again with the next,
+    # so words spanning a chunk boundary are found.
+    def __init__(self, matcher: Matcher) -> None:
+        self.matcher = matcher
+        self.pending: list[str] = []
+        self.size = 0
+        self.tail = ""
+        self.words: set[str] = set()
+
+    def feed(self, text: str) -> None:
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= SCAN_CHUNK:
+            self.flush()
+
+    def flush(self) -> None:
+        folded = self.tail + "".join(self.pending).casefold()
+        self.words |= folded_matches(self.matcher, folded)
+        overlap = self.matcher.longest - 1
+        self.tail = folded[-overlap:] if overlap > 0 else ""
+        self.pending = []
+        self.size = 0
+
+    def finish(self) -> set[str]:
+        self.flush()
+        return self.words
+
+
+def remote_url(repository: str | None = None) -> tuple[str | None, bool]:
+    location = ["-C", repository] if repository is not None else []
+    origin = git(*location, "remote", "get-url", "origin")
     if origin.returncode == 0 and origin.stdout.strip():
         return origin.stdout.strip(), False
-    remotes = git("remote")
+    remotes = git(*location, "remote")
     if remotes.returncode != 0:
         return None, False
     if not remotes.stdout.splitlines():
         return None, True
-    fallback = git("remote", "get-url", remotes.stdout.splitlines()[0])
+    fallback = git(*location, "remote", "get-url", remotes.stdout.splitlines()[0])
     if fallback.returncode != 0:
         return None, False
     return fallback.stdout.strip() or None, False
@@ -108,7 +320,7 @@ def cache_path(remote: str) -> Path:
     return cache_directory() / f"{key}.json"
 
 
-def read_cached_visibility(path: Path, now: int) -> str | None:
+def read_cached_visibility(path: Path, now: int) -> tuple[str, bool] | None:
     try:
         cached = json.loads(path.read_text())
         checked_at = int(cached["checked_at"])
@@ -116,9 +328,7 @@ def read_cached_visibility(path: Path, now: int) -> str | None:
     except (OSError, KeyError, TypeError, ValueError, json.JSONDecodeError):
         return None
     age = now - checked_at
-    if 0 <= age < visibility_ttl():
-        return visibility
-    return None
+    return visibility, 0 <= age < visibility_ttl()
 
 
 def write_cached_visibility(path: Path, visibility: str, now: int) -> None:
@@ -134,17 +344,7 @@ def write_cached_visibility(path: Path, visibility: str, now: int) -> None:
             pass
 
 
-def repository_visibility() -> str:
-    remote, is_local = remote_url()
-    if is_local:
-        return "LOCAL"
-    if remote is None:
-        return "UNKNOWN"
-    path = cache_path(remote)
-    now = int(time.time())
-    cached = read_cached_visibility(path, now)
-    if cached is not None:
-        return cached
+def lookup_visibility(remote: str) -> str:
     try:
         result = subprocess.run(
             [
@@ -162,60 +362,572 @@ def repository_visibility() -> str:
             text=True,
             timeout=5,
         )
-        visibility = result.stdout.strip().upper()
-        if result.returncode != 0 or visibility not in KNOWN_VISIBILITIES:
-            visibility = "UNKNOWN"
     except (OSError, subprocess.TimeoutExpired):
-        visibility = "UNKNOWN"
+        return "UNKNOWN"
+    visibility = result.stdout.strip().upper()
+    if result.returncode != 0 or visibility not in KNOWN_VISIBILITIES:
+        return "UNKNOWN"
+    return visibility
+
+
+def take_lock(lock: Path) -> bool:
+    try:
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            if time.time() - lock.stat().st_mtime < REFRESH_LOCK_TIMEOUT:
+                return False
+            lock.touch()  # take over from a refresher that died
+    except OSError:
+        return False
+    return True
+
+
+def spawn_visibility_refresh(remote: str, path: Path) -> None:
+    if not take_lock(path.with_suffix(".lock")):
+        return
+    try:
+        subprocess.Popen(
+            [sys.executable, __file__, "refresh-visibility", remote],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        path.with_suffix(".lock").unlink(missing_ok=True)
+
+
+def refresh_visibility(remote: str) -> int:
+    path = cache_path(remote)
+    try:
+        write_cached_visibility(path, lookup_visibility(remote), int(time.time()))
+    finally:
+        path.with_suffix(".lock").unlink(missing_ok=True)
+    return 0
+
+
+def repository_visibility(remote: str | None = None) -> str:
+    if remote is None:
+        remote, is_local = remote_url()
+        if is_local:
+            return "LOCAL"
+        if remote is None:
+            return "UNKNOWN"
+    path = cache_path(remote)
+    now = int(time.time())
+    cached = read_cached_visibility(path, now)
+    if cached is not None:
+        # Serve the last known visibility at once; an expired one is
+        # refreshed in the background for the next commit.
+        visibility, fresh = cached
+        if not fresh:
+            spawn_visibility_refresh(remote, path)
+        return visibility
+    visibility = lookup_visibility(remote)
     write_cached_visibility(path, visibility, now)
     return visibility
 
 
-def staged_paths() -> list[str]:
+def discover_repositories(root: Path) -> list[str]:
+    repositories: list[str] = []
+    for directory, child_directories, files in os.walk(root):
+        if ".git" in child_directories or ".git" in files:
+            repositories.append(directory)
+        if len(Path(directory).relative_to(root).parts) >= MAX_DISCOVERY_DEPTH:
+            child_directories.clear()
+            continue
+        child_directories[:] = [
+            name
+            for name in child_directories
+            if name not in PRUNED_DIRECTORIES and not name.startswith(".")
+        ]
+    return repositories
+
+
+def github_repository(remote: str) -> tuple[str, str, str] | None:
+    # scheme://[user@]host[:port]/owner/name or scp-like [user@]host:owner/name
+    match = re.fullmatch(
+        r"[a-z+]+://(?:[^@/]*@)?([^/:]+)(?::\d+)?/([^/]+)/([^/]+?)(?:\.git)?/?",
+        remote,
+    ) or re.fullmatch(r"(?:[^@/]*@)?([^/:]+):([^/]+)/([^/]+?)(?:\.git)?/?", remote)
+    if match is None:
+        return None
+    host, owner, name = match.groups()
+    return host, owner, name
+
+
+def batch_visibility(host: str, repositories: list[tuple[str, str]]) -> list[str]:
+    fields = " ".join(
+        f"r{index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)})"
+        " { visibility }"
+        for index, (owner, name) in enumerate(repositories)
+    )
+    try:
+        result = subprocess.run(
+            ["gh", "api", "graphql", "--hostname", host, "-f", f"query={{{fields}}}"],
+            check=False,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        # Repositories that cannot be resolved are null and listed under
+        # "errors" (gh then exits non-zero); the others are still answered.
+        data = json.loads(result.stdout)["data"] or {}
+    except (OSError, subprocess.TimeoutExpired, KeyError, TypeError, ValueError):
+        data = {}
+    visibilities = []
+    for index in range(len(repositories)):
+        entry = data.get(f"r{index}") or {}
+        visibility = str(entry.get("visibility", "")).upper()
+        visibilities.append(
+            visibility if visibility in KNOWN_VISIBILITIES else "UNKNOWN"
+        )
+    return visibilities
+
+
+def prefetch_visibility(repositories: list[str]) -> int:
+    remotes: set[str] = set()
+    for repository in repositories or discover_repositories(Path.home()):
+        remote, _ = remote_url(repository)
+        if remote is not None:
+            remotes.add(remote)
+    by_host: dict[str, list[tuple[str, str, str]]] = {}
+    visibilities: dict[str, str] = {}
+    for remote in sorted(remotes):
+        parsed = github_repository(remote)
+        if parsed is None:
+            visibilities[remote] = lookup_visibility(remote)
+        else:
+            host, owner, name = parsed
+            by_host.setdefault(host, []).append((remote, owner, name))
+    for host, entries in by_host.items():
+        for start in range(0, len(entries), GRAPHQL_BATCH):
+            batch = entries[start : start + GRAPHQL_BATCH]
+            names = [(owner, name) for _, owner, name in batch]
+            answers = batch_visibility(host, names)
+            for (remote, _, _), visibility in zip(batch, answers):
+                visibilities[remote] = visibility
+    now = int(time.time())
+    known = 0
+    for remote, visibility in visibilities.items():
+        # A failed lookup leaves any earlier answer in place.
+        if visibility != "UNKNOWN":
+            write_cached_visibility(cache_path(remote), visibility, now)
+            known += 1
+    print(f"Cached the visibility of {known} of {len(remotes)} remotes")
+    return 0
+
+
+C_ESCAPES = {
+    "a": b"\a",
+    "b": b"\b",
+    "t": b"\t",
+    "n": b"\n",
+    "v": b"\v",
+    "f": b"\f",
+    "r": b"\r",
+    '"': b'"',
+    "\\": b"\\",
+}
+
+
+def unquote_path(quoted: str) -> str:
+    if not quoted.startswith('"'):
+        return quoted
+    raw = bytearray()
+    index = 1
+    while index < len(quoted) - 1:
+        character = quoted[index]
+        if character != "\\":
+            raw += character.encode(errors="surrogateescape")
+            index += 1
+        elif quoted[index + 1] in C_ESCAPES:
+            raw += C_ESCAPES[quoted[index + 1]]
+            index += 2
+        else:
+            raw.append(int(quoted[index + 1 : index + 4], 8))
+            index += 4
+    return os.fsdecode(bytes(raw))
+
+
+def diff_header_path(header: str) -> str:
+    names = header[len("diff --git ") :]
+    if names.startswith('"'):
+        end = 1
+        while names[end] != '"':
+            end += 2 if names[end] == "\\" else 1
+        return unquote_path(names[: end + 1])[len("a/") :]
+    # Without renames both sides name the same path: "a/<path> b/<path>".
+    return names[len("a/") : (len(names) - 1) // 2]
+
+
+def staged_blobs() -> list[tuple[str, str, str]] | None:
     result = subprocess.run(
-        ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR", "-z"],
+        [
+            "git",
+            "diff",
+            "--cached",
+            "--raw",
+            "-z",
+            "--no-abbrev",
+            "--no-renames",
+            "--diff-filter=ACMR",
+        ],
         check=False,
         capture_output=True,
     )
     if result.returncode != 0:
-        return []
-    return [os.fsdecode(path) for path in result.stdout.split(b"\0") if path]
+        return None
+    # ":<old mode> <new mode> <old blob> <new blob> <status>\0<path>\0"
+    fields = result.stdout.split(b"\0")
+    blobs = []
+    for header, path in zip(fields[0:-1:2], fields[1::2]):
+        _, _, old_blob, new_blob, _ = header.decode().split(" ")
+        blobs.append((os.fsdecode(path), old_blob, new_blob))
+    return blobs
 
 
-def added_text(path: str) -> str:
-    result = git(
+def scan_staged_additions(
+    matcher: Matcher, paths: list[str] | None = None
+) -> Iterator[tuple[str, set[str]]]:
+    # One diff for the whole index, or for the given paths. Renames are split
+    # into a deletion and an addition, so a renamed file counts as added in
+    # full, as it did when each path was diffed on its own. --text turns
+    # binary markers into lines.
+    command = [
+        "git",
         "diff",
         "--cached",
         "--unified=0",
         "--no-color",
+        "--no-renames",
         "--text",
+        "--src-prefix=a/",
+        "--dst-prefix=b/",
         "--diff-filter=ACMR",
-        "--",
-        path,
+    ]
+    if paths is not None:
+        command += ["--", *(f":(top,literal){path}" for path in paths)]
+    return scan_diff_additions(matcher, command)
+
+
+def scan_diff_additions(
+    matcher: Matcher, command: list[str]
+) -> Iterator[tuple[str, set[str]]]:
+    with subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    ) as process:
+        assert process.stdout is not None
+        lines = io.TextIOWrapper(process.stdout, errors="surrogateescape", newline="\n")
+        path: str | None = None
+        scan = ChunkedScan(matcher)
+        in_hunk = False
+        adding = False
+        # Lines are read SCAN_CHUNK characters at most at a time; a longer
+        # line continues in the next segment.
+        line_start = True
+        while segment := lines.readline(SCAN_CHUNK):
+            content = segment
+            if line_start:
+                if segment.startswith("diff --git "):
+                    if path is not None:
+                        yield path, scan.finish()
+                    path = diff_header_path(segment.rstrip("\n"))
+                    scan = ChunkedScan(matcher)
+                    in_hunk = False
+                    adding = False
+                    continue
+                if segment.startswith("@@ "):
+                    in_hunk = True
+                adding = in_hunk and segment.startswith("+")
+                if adding:
+                    scan.feed("\n")
+                    content = segment[1:]
+            line_start = segment.endswith("\n")
+            if adding:
+                scan.feed(content[:-1] if line_start else content)
+        if path is not None:
+            yield path, scan.finish()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+
+def large_blob_policy() -> tuple[int, str]:
+    try:
+        limit = int(
+            os.environ.get(
+                "GIT_FORBIDDEN_WORDS_MAX_BLOB_SIZE", str(DEFAULT_MAX_BLOB_SIZE)
+            )
+        )
+    except ValueError:
+        limit = DEFAULT_MAX_BLOB_SIZE
+    policy = os.environ.get("GIT_FORBIDDEN_WORDS_LARGE_BLOBS", "sample")
+    return max(0, limit), policy if policy in LARGE_BLOB_POLICIES else "sample"
+
+
+def blob_sizes(blobs: list[str]) -> dict[str, int]:
+    result = git(
+        "cat-file",
+        "--batch-check",
+        "--buffer",
+        input_text="".join(f"{blob}\n" for blob in blobs),
     )
-    if result.returncode != 0:
-        return ""
-    added_lines: list[str] = []
-    in_hunk = False
+    sizes: dict[str, int] = {}
     for line in result.stdout.splitlines():
-        if line.startswith("@@ "):
-            in_hunk = True
-        elif in_hunk and line.startswith("+"):
-            added_lines.append(line[1:])
-    return "\n".join(added_lines)
+        # "<blob> blob <size>", or "<object> missing" for gitlinks
+        fields = line.split(" ")
+        if len(fields) == 3 and fields[1] == "blob":
+            sizes[fields[0]] = int(fields[2])
+    return sizes
 
 
-def find_staged_violations(rules: list[Rule]) -> list[Violation]:
-    violations: list[Violation] = []
-    for path in staged_paths():
-        if Path(path).as_posix() == RULES_REPOSITORY_PATH:
+def scan_large_blob(
+    matcher: Matcher, path: str, blob: str, size: int, policy: str
+) -> set[str]:
+    # Too large to diff: either skipped, or the start of the blob is checked
+    # (binary blobs, by git's own test, are always skipped).
+    sample = b""
+    if policy == "sample":
+        with subprocess.Popen(
+            ["git", "cat-file", "blob", blob],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        ) as process:
+            assert process.stdout is not None
+            sample = process.stdout.read(LARGE_BLOB_SAMPLE)
+            process.kill()
+    if not sample or b"\0" in sample[:BINARY_CHECK_BYTES]:
+        print(
+            f"Forbidden-word scan skipped {path} ({size} bytes)",
+            file=sys.stderr,
+        )
+        return set()
+    print(
+        f"Forbidden-word scan checked only the first {len(sample)} bytes of "
+        f"{path} ({size} bytes)",
+        file=sys.stderr,
+    )
+    return matched_words(matcher, sample.decode(errors="surrogateescape"))
+
+
+def scan_cache_path() -> Path:
+    return cache_directory() / "scans.sqlite3"
+
+
+def connect_scan_cache() -> sqlite3.Connection:
+    global _connection
+    if _connection is None:
+        path = scan_cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=1, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS scans ("
+            "old_blob TEXT NOT NULL, new_blob TEXT NOT NULL, digest TEXT NOT NULL, "
+            "words TEXT NOT NULL, used REAL NOT NULL, "
+            "PRIMARY KEY (old_blob, new_blob, digest))"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS scans_used ON scans (used)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS outcomes ("
+            "head_tree TEXT NOT NULL, index_tree TEXT NOT NULL, "
+            "digest TEXT NOT NULL, violations TEXT NOT NULL, used REAL NOT NULL, "
+            "PRIMARY KEY (head_tree, index_tree, digest))"
+        )
+        _connection = connection
+    return _connection
+
+
+def read_cached_scans(
+    connection: sqlite3.Connection, digest: str, pairs: set[tuple[str, str]]
+) -> dict[tuple[str, str], set[str]]:
+    cached: dict[tuple[str, str], set[str]] = {}
+    stale: list[tuple[float, str, str, str]] = []
+    now = time.time()
+    for old_blob, new_blob in pairs:
+        row = connection.execute(
+            "SELECT words, used FROM scans "
+            "WHERE old_blob = ? AND new_blob = ? AND digest = ?",
+            (old_blob, new_blob, digest),
+        ).fetchone()
+        if row is None:
             continue
-        folded_path = path.casefold()
-        folded_text = added_text(path).casefold()
-        for rule in rules:
-            folded_word = rule.word.casefold()
-            if folded_word in folded_path or folded_word in folded_text:
-                violations.append(Violation(location=path, rule=rule))
+        words, used = row
+        cached[(old_blob, new_blob)] = set(json.loads(words))
+        if now - used > BLOB_CACHE_TOUCH_INTERVAL:
+            stale.append((now, old_blob, new_blob, digest))
+    if stale:
+        connection.executemany(
+            "UPDATE scans SET used = ? "
+            "WHERE old_blob = ? AND new_blob = ? AND digest = ?",
+            stale,
+        )
+    return cached
+
+
+def write_cached_scans(
+    connection: sqlite3.Connection,
+    digest: str,
+    scanned: dict[tuple[str, str], set[str]],
+) -> None:
+    now = time.time()
+    connection.execute("BEGIN")
+    connection.executemany(
+        "INSERT OR REPLACE INTO scans (old_blob, new_blob, digest, words, used) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [
+            (old_blob, new_blob, digest, json.dumps(sorted(words)), now)
+            for (old_blob, new_blob), words in scanned.items()
+        ],
+    )
+    connection.execute(
+        "DELETE FROM scans WHERE rowid IN (SELECT rowid FROM scans "
+        "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+        (BLOB_CACHE_MAX_ENTRIES,),
+    )
+    connection.execute("COMMIT")
+
+
+def scan_staged_violations(matcher: Matcher, digest: str) -> list[Violation] | None:
+    blobs = staged_blobs()
+    if blobs is None:
+        return None
+    blobs = [
+        (path, old_blob, new_blob)
+        for path, old_blob, new_blob in blobs
+        if Path(path).as_posix() != RULES_REPOSITORY_PATH
+    ]
+    # The added text of a file depends only on its old and new blob, so a
+    # pair scanned before under the same rules is not diffed again.
+    pairs = {(old_blob, new_blob) for _, old_blob, new_blob in blobs}
+    connection: sqlite3.Connection | None = None
+    try:
+        connection = connect_scan_cache()
+        cached = read_cached_scans(connection, digest, pairs)
+    except (OSError, sqlite3.Error):
+        cached = {}
+
+    unscanned = [
+        (path, new_blob)
+        for path, old_blob, new_blob in blobs
+        if (old_blob, new_blob) not in cached
+    ]
+    scanned_words: dict[str, set[str]] = {}
+    limit, policy = large_blob_policy()
+    if limit and unscanned:
+        sizes = blob_sizes([new_blob for _, new_blob in unscanned])
+        regular = []
+        for path, new_blob in unscanned:
+            size = sizes.get(new_blob, 0)
+            if size > limit:
+                scanned_words[path] = scan_large_blob(
+                    matcher, path, new_blob, size, policy
+                )
+            else:
+                regular.append(path)
+    else:
+        regular = [path for path, _ in unscanned]
+
+    batches: list[list[str] | None] = []
+    if len(regular) == len(blobs):
+        batches = [None] if blobs else []
+    else:
+        batches = [
+            regular[start : start + PATHSPEC_BATCH]
+            for start in range(0, len(regular), PATHSPEC_BATCH)
+        ]
+    try:
+        for batch in batches:
+            for path, words in scan_staged_additions(matcher, batch):
+                scanned_words[path] = words
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    violations: list[Violation] = []
+    scanned: dict[tuple[str, str], set[str]] = {}
+    for path, old_blob, new_blob in blobs:
+        words = cached.get((old_blob, new_blob))
+        if words is None:
+            words = scanned_words.get(path, set())
+            scanned[(old_blob, new_blob)] = words
+        violations.extend(
+            Violation(location=path, rule=rule)
+            for rule in rules_for_words(matcher, words | matched_words(matcher, path))
+        )
+    if connection is not None and scanned:
+        try:
+            write_cached_scans(connection, digest, scanned)
+        except sqlite3.Error:
+            pass
+    return violations
+
+
+def staged_trees() -> tuple[str, str] | None:
+    # The tree git commit is about to record, and the tree it is diffed
+    # against ("" on an unborn branch). Both respect GIT_INDEX_FILE, which
+    # `git commit -a` and `git commit <paths>` point at a temporary index.
+    index_tree = git("write-tree")
+    if index_tree.returncode != 0:
+        return None
+    head_tree = git("rev-parse", "--verify", "--quiet", "HEAD^{tree}")
+    return head_tree.stdout.strip(), index_tree.stdout.strip()
+
+
+def scan_digest(matcher: Matcher) -> str:
+    # Scan results depend on the rules and on the large blob policy.
+    limit, policy = large_blob_policy()
+    return hashlib.sha256(f"{matcher.digest}:{limit}:{policy}".encode()).hexdigest()
+
+
+def find_staged_violations(matcher: Matcher) -> list[Violation]:
+    # pre-commit records its outcome for the staged trees; commit-msg, run
+    # moments later on the same trees, reuses it instead of scanning again.
+    digest = scan_digest(matcher)
+    trees = staged_trees()
+    connection: sqlite3.Connection | None = None
+    if trees is not None:
+        try:
+            connection = connect_scan_cache()
+            row = connection.execute(
+                "SELECT violations FROM outcomes "
+                "WHERE head_tree = ? AND index_tree = ? AND digest = ?",
+                (*trees, digest),
+            ).fetchone()
+        except (OSError, sqlite3.Error):
+            row = None
+        if row is not None:
+            return [
+                Violation(location=location, rule=matcher.rules[index])
+                for location, index in json.loads(row[0])
+            ]
+
+    violations = scan_staged_violations(matcher, digest)
+    if violations is None:
+        return []
+    if connection is not None and trees is not None:
+        recorded = [
+            [violation.location, matcher.rules.index(violation.rule)]
+            for violation in violations
+        ]
+        try:
+            connection.execute("BEGIN")
+            connection.execute(
+                "INSERT OR REPLACE INTO outcomes "
+                "(head_tree, index_tree, digest, violations, used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*trees, digest, json.dumps(recorded), time.time()),
+            )
+            connection.execute(
+                "DELETE FROM outcomes WHERE rowid IN (SELECT rowid FROM outcomes "
+                "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (OUTCOME_CACHE_MAX_ENTRIES,),
+            )
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            pass
     return violations
 
 
@@ -228,17 +940,400 @@ def commit_message_text(path: Path) -> str:
     return stripped.stdout if stripped.returncode == 0 else message
 
 
-def find_message_violations(path: Path, rules: list[Rule]) -> list[Violation]:
-    folded_message = commit_message_text(path).casefold()
+def find_message_violations(path: Path, matcher: Matcher) -> list[Violation]:
     return [
         Violation(location="commit message", rule=rule)
-        for rule in rules
-        if rule.word.casefold() in folded_message
+        for rule in matching_rules(matcher, commit_message_text(path))
     ]
 
 
-def print_violations(violations: list[Violation]) -> None:
-    print("Commit blocked by forbidden-word rules:", file=sys.stderr)
+def scan_blob_stream(
+    matcher: Matcher, stream: io.BufferedIOBase, size: int
+) -> tuple[set[str], str]:
+    # Whole-blob counterpart of the staged scan: reads exactly size bytes and
+    # applies the same large blob policy. Returns the words found and "",
+    # "sampled" or "skipped".
+    limit, policy = large_blob_policy()
+    budget, note = size, ""
+    if limit and size > limit:
+        if policy == "sample":
+            budget, note = LARGE_BLOB_SAMPLE, "sampled"
+        else:
+            budget, note = 0, "skipped"
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+    scan = ChunkedScan(matcher)
+    remaining = size
+    while remaining:
+        chunk = stream.read(min(SCAN_CHUNK, remaining))
+        if not chunk:
+            raise EOFError("blob content cut short")
+        if note == "sampled" and remaining == size:
+            if b"\0" in chunk[:BINARY_CHECK_BYTES]:
+                budget, note = 0, "skipped"
+        if budget > 0:
+            scan.feed(decoder.decode(chunk[:budget]))
+            budget -= len(chunk)
+        remaining -= len(chunk)
+    if note == "skipped":
+        return set(), note
+    scan.feed(decoder.decode(b"", final=True))
+    return scan.finish(), note
+
+
+_audit_matcher: Matcher | None = None
+
+
+def start_audit_worker(matcher: Matcher) -> None:
+    global _audit_matcher
+    _audit_matcher = matcher
+
+
+def audit_blobs(blobs: list[str]) -> list[tuple[str, list[str], str]]:
+    assert _audit_matcher is not None
+    return scan_blobs(_audit_matcher, blobs)
+
+
+def scan_blobs(matcher: Matcher, blobs: list[str]) -> list[tuple[str, list[str], str]]:
+    results = []
+    with subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ) as process:
+        assert process.stdin is not None and process.stdout is not None
+        process.stdin.write("".join(f"{blob}\n" for blob in blobs).encode())
+        process.stdin.close()
+        for blob in blobs:
+            # "<blob> blob <size>" then the content and a newline
+            header = process.stdout.readline().decode().split()
+            if len(header) != 3 or header[1] != "blob":
+                results.append((blob, [], "skipped"))
+                continue
+            size = int(header[2])
+            words, note = scan_blob_stream(matcher, process.stdout, size)
+            process.stdout.read(1)
+            results.append((blob, sorted(words), note))
+    return results
+
+
+def history_messages(revisions: list[str]) -> Iterator[tuple[str, str]]:
+    with subprocess.Popen(
+        ["git", "log", "--format=%x00%H%n%B", *revisions],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ) as process:
+        assert process.stdout is not None
+        stream = io.TextIOWrapper(process.stdout, errors="surrogateescape", newline="")
+        buffered = ""
+        while chunk := stream.read(SCAN_CHUNK):
+            *records, buffered = (buffered + chunk).split("\0")
+            for record in records:
+                if record:
+                    commit, _, message = record.partition("\n")
+                    yield commit, message
+        if buffered:
+            commit, _, message = buffered.partition("\n")
+            yield commit, message
+
+
+def history_changes(revisions: list[str]) -> Iterator[tuple[str, str, str, str]]:
+    # (commit, path, old blob, new blob) for every file a commit adds or
+    # changes. Merges are diffed against their first parent, so every blob in
+    # any reachable tree shows up in the commit that first brings it in.
+    # --root: root commits are only diffed by default while log.showRoot is on.
+    with subprocess.Popen(
+        [
+            "git",
+            "log",
+            "--format=commit %H",
+            "--raw",
+            "--root",
+            "--no-abbrev",
+            "--no-renames",
+            "--diff-merges=first-parent",
+            *revisions,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ) as process:
+        assert process.stdout is not None
+        lines = io.TextIOWrapper(process.stdout, errors="surrogateescape", newline="\n")
+        commit = ""
+        for line in lines:
+            if line.startswith("commit "):
+                commit = line[len("commit ") :].rstrip("\n")
+            elif line.startswith(":"):
+                # ":<old mode> <new mode> <old blob> <new blob> <status>\t<path>"
+                header, _, path = line.rstrip("\n").partition("\t")
+                _, new_mode, old_blob, new_blob, _ = header.split(" ")
+                if new_blob.strip("0") and new_mode != GITLINK_MODE:
+                    yield commit, unquote_path(path), old_blob, new_blob
+
+
+def audit_checkpoint_path() -> Path | None:
+    common = git("rev-parse", "--path-format=absolute", "--git-common-dir")
+    if common.returncode != 0:
+        return None
+    key = hashlib.sha256(common.stdout.strip().encode()).hexdigest()[:20]
+    return cache_directory() / "audit" / f"{key}.jsonl"
+
+
+def read_audit_checkpoint(
+    path: Path, digest: str
+) -> dict[str, tuple[list[str], str]]:
+    done: dict[str, tuple[list[str], str]] = {}
+    try:
+        with path.open() as checkpoint:
+            if json.loads(checkpoint.readline()).get("digest") != digest:
+                return {}
+            for line in checkpoint:
+                try:
+                    blob, words, note = json.loads(line)
+                except ValueError:
+                    continue  # a record cut short by an interrupted run
+                done[blob] = (words, note)
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return done
+
+
+def run_audit(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="forbidden-words-hook audit",
+        description="Scan every blob and commit message reachable from any ref.",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--restart", action="store_true", help="discard the saved progress"
+    )
+    options = parser.parse_args(arguments)
+    try:
+        matcher = load_matcher()
+    except (OSError, UnicodeError, ValueError) as error:
+        print(f"Forbidden-word configuration error: {error}", file=sys.stderr)
+        return 1
+    checkpoint = audit_checkpoint_path()
+    if checkpoint is None:
+        print("forbidden-words-hook audit: not a git repository", file=sys.stderr)
+        return 2
+    digest = scan_digest(matcher)
+    done = {} if options.restart else read_audit_checkpoint(checkpoint, digest)
+
+    violations: list[Violation] = []
+    messages = 0
+    for commit, message in history_messages(["--all"]):
+        messages += 1
+        violations.extend(
+            Violation(location=f"{commit[:12]} commit message", rule=rule)
+            for rule in matching_rules(matcher, message)
+        )
+    blobs: dict[str, None] = {}
+    paths: set[str] = set()
+    for commit, path, _, blob in history_changes(["--all"]):
+        blobs[blob] = None
+        if path not in paths:
+            paths.add(path)
+            violations.extend(
+                Violation(location=f"{commit[:12]} {path}", rule=rule)
+                for rule in matching_rules(matcher, path)
+            )
+
+    pending = [blob for blob in blobs if blob not in done]
+    try:
+        checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        if not done:
+            checkpoint.write_text(json.dumps({"digest": digest}) + "\n")
+        else:
+            with checkpoint.open("rb+") as progress:
+                progress.seek(-1, os.SEEK_END)
+                if progress.read(1) != b"\n":
+                    progress.write(b"\n")
+        with checkpoint.open("a") as progress, ProcessPoolExecutor(
+            max_workers=max(1, options.jobs),
+            initializer=start_audit_worker,
+            initargs=(matcher,),
+        ) as pool:
+            batches = [
+                pending[start : start + BLOB_BATCH]
+                for start in range(0, len(pending), BLOB_BATCH)
+            ]
+            running = {pool.submit(audit_blobs, batch) for batch in batches}
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for blob, words, note in future.result():
+                        done[blob] = (words, note)
+                        progress.write(json.dumps([blob, words, note]) + "\n")
+                progress.flush()
+                if sys.stderr.isatty():
+                    print(f"\r{len(done)}/{len(blobs)} blobs", end="", file=sys.stderr)
+    except KeyboardInterrupt:
+        print(
+            "\nforbidden-words-hook audit: interrupted; run again to resume",
+            file=sys.stderr,
+        )
+        return 130
+    if sys.stderr.isatty() and pending:
+        print(file=sys.stderr)
+
+    hits = {blob: words for blob, (words, _) in done.items() if blob in blobs and words}
+    for commit, path, _, blob in history_changes(["--all"]) if hits else ():
+        if blob in hits:
+            violations.extend(
+                Violation(location=f"{commit[:12]} {path}", rule=rule)
+                for rule in rules_for_words(matcher, set(hits[blob]))
+            )
+    notes = [note for blob, (_, note) in done.items() if blob in blobs and note]
+    if notes:
+        print(
+            f"Large blobs: {notes.count('sampled')} sampled, "
+            f"{notes.count('skipped')} skipped (see GIT_FORBIDDEN_WORDS_LARGE_BLOBS)",
+            file=sys.stderr,
+        )
+    if violations:
+        print("Forbidden words found in history:", file=sys.stderr)
+        for violation in violations:
+            print(
+                f"  {violation.location}: {violation.rule.word} - "
+                f"{violation.rule.reason}",
+                file=sys.stderr,
+            )
+        return 1
+    print(f"No forbidden words in {len(blobs)} blobs and {messages} commit messages")
+    return 0
+
+
+def pushed_revisions(remote: str, updates: str) -> list[str]:
+    # Pre-push input: "<local ref> <local object> <remote ref> <remote object>"
+    # per ref. Deletions push nothing; remote objects we do not have cannot
+    # be excluded, but whatever reaches them is covered by --remotes.
+    pushed: list[str] = []
+    remote_objects: list[str] = []
+    for line in updates.splitlines():
+        fields = line.split()
+        if len(fields) != 4:
+            continue
+        if fields[1].strip("0"):
+            pushed.append(fields[1])
+        if fields[3].strip("0"):
+            remote_objects.append(fields[3])
+    if not pushed:
+        return []
+    known = git(
+        "cat-file",
+        "--batch-check",
+        input_text="".join(f"{remote_object}\n" for remote_object in remote_objects),
+    )
+    present = [
+        line.split(" ")[0]
+        for line in known.stdout.splitlines()
+        if not line.endswith(" missing")
+    ]
+    return [*pushed, "--not", *present, f"--remotes={remote}"]
+
+
+def scan_blob_pair(matcher: Matcher, old_blob: str, new_blob: str) -> set[str]:
+    command = [
+        "git",
+        "diff",
+        "--unified=0",
+        "--no-color",
+        "--text",
+        "--src-prefix=a/",
+        "--dst-prefix=b/",
+        old_blob,
+        new_blob,
+    ]
+    words: set[str] = set()
+    for _, found in scan_diff_additions(matcher, command):
+        words |= found
+    return words
+
+
+def find_pushed_violations(
+    matcher: Matcher, remote: str, updates: str
+) -> list[Violation]:
+    revisions = pushed_revisions(remote, updates)
+    if not revisions:
+        return []
+    violations: list[Violation] = []
+    for commit, message in history_messages(revisions):
+        violations.extend(
+            Violation(location=f"{commit[:12]} commit message", rule=rule)
+            for rule in matching_rules(matcher, message)
+        )
+    changes = [
+        change
+        for change in history_changes(revisions)
+        if Path(change[1]).as_posix() != RULES_REPOSITORY_PATH
+    ]
+
+    # Scan results are keyed like the staged scan's: the added text of
+    # (old blob, new blob), where an all-zero old blob means the whole new
+    # blob. Pairs committed through pre-commit are therefore already cached.
+    digest = scan_digest(matcher)
+    whole = {new_blob: ("0" * len(new_blob), new_blob) for *_, new_blob in changes}
+    pairs = {(old_blob, new_blob) for *_, old_blob, new_blob in changes}
+    connection: sqlite3.Connection | None = None
+    try:
+        connection = connect_scan_cache()
+        cached = read_cached_scans(connection, digest, pairs | set(whole.values()))
+    except (OSError, sqlite3.Error):
+        cached = {}
+
+    # New blobs of uncached pairs are scanned whole, one cat-file per batch.
+    # Only when that finds a word in a changed file is the pair diffed, so
+    # words already present in the old blob are not reported.
+    unscanned = sorted(
+        {
+            new_blob
+            for old_blob, new_blob in pairs - cached.keys()
+            if whole[new_blob] not in cached
+        }
+    )
+    scanned: dict[tuple[str, str], set[str]] = {}
+    large: set[str] = set()
+    for start in range(0, len(unscanned), BLOB_BATCH):
+        batch = unscanned[start : start + BLOB_BATCH]
+        for blob, words, note in scan_blobs(matcher, batch):
+            scanned[whole[blob]] = set(words)
+            if note:
+                large.add(blob)
+    results = {**cached, **scanned}
+    suspects = [
+        (old_blob, new_blob)
+        for old_blob, new_blob in pairs - results.keys()
+        if results[whole[new_blob]]
+    ]
+    if suspects:
+        limit, _ = large_blob_policy()
+        sizes = blob_sizes([new_blob for _, new_blob in suspects]) if limit else {}
+        large |= {blob for blob, size in sizes.items() if size > limit}
+    for old_blob, new_blob in pairs - results.keys():
+        if new_blob in large or not results[whole[new_blob]]:
+            # Clean, or too large to diff: the staged scan samples these
+            # whole as well.
+            results[(old_blob, new_blob)] = results[whole[new_blob]]
+        else:
+            results[(old_blob, new_blob)] = scan_blob_pair(matcher, old_blob, new_blob)
+        scanned[(old_blob, new_blob)] = results[(old_blob, new_blob)]
+
+    for commit, path, old_blob, new_blob in changes:
+        words = results[(old_blob, new_blob)] | matched_words(matcher, path)
+        violations.extend(
+            Violation(location=f"{commit[:12]} {path}", rule=rule)
+            for rule in rules_for_words(matcher, words)
+        )
+    if connection is not None and scanned:
+        try:
+            write_cached_scans(connection, digest, scanned)
+        except sqlite3.Error:
+            pass
+    return violations
+
+
+def print_violations(violations: list[Violation], action: str = "Commit") -> None:
+    print(f"{action} blocked by forbidden-word rules:", file=sys.stderr)
     for violation in violations:
         print(
             f"  {violation.location}: {violation.rule.word} - {violation.rule.reason}",
@@ -247,29 +1342,53 @@ def print_violations(violations: list[Violation]) -> None:
 
 
 def run_hook(hook_name: str, arguments: list[str]) -> int:
-    if repository_visibility() not in SKIP_VISIBILITIES:
+    # pre-push is given the remote name and the URL being pushed to.
+    push_url = arguments[1] if hook_name == "pre-push" and len(arguments) > 1 else None
+    if repository_visibility(push_url) not in SKIP_VISIBILITIES:
         try:
-            rules = load_rules()
+            matcher = load_matcher()
         except (OSError, UnicodeError, ValueError) as error:
             print(f"Forbidden-word configuration error: {error}", file=sys.stderr)
             return 1
         if hook_name == "pre-commit":
-            violations = find_staged_violations(rules)
+            violations = find_staged_violations(matcher)
         elif hook_name == "commit-msg" and arguments:
-            violations = find_staged_violations(rules)
-            violations.extend(find_message_violations(Path(arguments[0]), rules))
+            violations = find_staged_violations(matcher)
+            violations.extend(find_message_violations(Path(arguments[0]), matcher))
+        elif hook_name == "pre-push" and arguments:
+            updates = sys.stdin.read()
+            try:
+                violations = find_pushed_violations(matcher, arguments[0], updates)
+            except (OSError, EOFError, subprocess.CalledProcessError) as error:
+                # Refuse a push that could not be scanned, with the reason
+                # rather than a traceback.
+                print(
+                    f"Forbidden-word scan of the push failed: {error}",
+                    file=sys.stderr,
+                )
+                return 1
         else:
             violations = []
         if violations:
-            print_violations(violations)
+            action = "Push" if hook_name == "pre-push" else "Commit"
+            print_violations(violations, action)
             return 1
     return 0
 
 
 def main(arguments: list[str]) -> int:
-    if not arguments or arguments[0] not in {"pre-commit", "commit-msg"}:
+    if arguments[:1] == ["audit"]:
+        return run_audit(arguments[1:])
+    if arguments[:1] == ["prefetch-visibility"]:
+        return prefetch_visibility(arguments[1:])
+    if arguments[:1] == ["refresh-visibility"] and len(arguments) == 2:
+        return refresh_visibility(arguments[1])
+    if not arguments or arguments[0] not in {"pre-commit", "commit-msg", "pre-push"}:
         print(
-            "usage: forbidden-words-hook {pre-commit|commit-msg} [hook arguments]",
+            "usage: forbidden-words-hook {pre-commit|commit-msg|pre-push} "
+            "[hook arguments]\n"
+            "       forbidden-words-hook audit [--jobs N] [--restart]\n"
+            "       forbidden-words-hook prefetch-visibility [repository ...]",
             file=sys.stderr,
         )
         return 2
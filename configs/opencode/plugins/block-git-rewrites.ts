@@ -1,4 +1,31 @@
 import type { Plugin } from "@opencode-ai/plugin"
+import { readFileSync, statSync } from "fs"
+import { homedir } from "os"
+import { join } from "path"
+
+// Shared rule artifact written by ~/.claude/hooks/guard_artifact.py
+const ARTIFACT_VERSION = 2
+
+// Keywords of the git rules from a fresh artifact, or null when the artifact
+// is missing, of another version, or older than the rule modules.
+function gitKeywords(): string[] | null {
+  const cache = process.env.XDG_CACHE_HOME || join(homedir(), ".cache")
+  try {
+    const artifact = JSON.parse(
+      readFileSync(join(cache, "agent-guard", "rules.json"), "utf8"),
+    )
+    if (artifact.version !== ARTIFACT_VERSION) return null
+    for (const [path, [mtimeMs, size]] of Object.entries<number[]>(
+      artifact.sources,
+    )) {
+      const stat = statSync(path)
+      if (Math.floor(stat.mtimeMs) !== mtimeMs || stat.size !== size) return null
+    }
+    return artifact.keywords?.git ?? null
+  } catch {
+    return null
+  }
+}
 
 export const BlockGitRewrites: Plugin = async ({ $ }) => {
   return {
@@ -7,6 +34,14 @@ export const BlockGitRewrites: Plugin = async ({ $ }) => {
       const command = output.args.command
       if (!command) return
 
+      // No git rule can fire without one of its keywords: skip the Python
+      // spawn. Non-ASCII commands always go to the hook (see may_block).
+      const keywords = gitKeywords()
+      if (keywords && /^[\x00-\x7f]*$/.test(command)) {
+        const folded = command.toLowerCase()
+        if (!keywords.some((word) => folded.includes(word))) return
+      }
+
       // Format input like Claude Code's protocol and call the existing hook
       const hookInput = JSON.stringify({
         tool_name: "Bash",
@@ -14,7 +49,7 @@ export const BlockGitRewrites: Plugin = async ({ $ }) => {
       })
 
       try {
-        await $`echo ${hookInput} | python3 ~/.claude/hooks/block-git-rewrites.py`.quiet()
+        await $`echo ${hookInput} | python3 ~/.claude/hooks/block-git-rewrites.py --tool opencode`.quiet()
       } catch (e: any) {
         // Exit code 2 means blocked (Claude protocol)
         if (e.exitCode === 2) {
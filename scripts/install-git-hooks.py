@@ -9,8 +9,8 @@ does not run it or scan the user's repositories.
 
 With no arguments, the script discovers normal repository locations under the
 user's home directory.  Repository paths may instead be supplied explicitly.
-Existing ``pre-commit`` and ``commit-msg`` hooks are preserved through wrapper
-chaining, including hooks generated by the Python ``pre-commit`` package.
+Existing ``pre-commit``, ``commit-msg`` and ``pre-push`` hooks are preserved through
+wrapper chaining, including hooks generated by the Python ``pre-commit`` package.
 """
 
 from __future__ import annotations
@@ -22,7 +22,7 @@ import sys
 import tempfile
 from pathlib import Path
 
-HOOK_NAMES = ("pre-commit", "commit-msg")
+HOOK_NAMES = ("pre-commit", "commit-msg", "pre-push")
 HOOK_MARKER = "# git-forbidden-words-hook"
 PRE_COMMIT_MARKER = "# File generated by pre-commit"
 MAX_DISCOVERY_DEPTH = 5
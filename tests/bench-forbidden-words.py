@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""Scaling benchmark for the forbidden-words Git hook (configs/git/forbidden_words.py).
+
+Generates throwaway repositories whose index holds a configurable number of
+staged files of a given size, a share of them renamed and the rest modified,
+against a configurable number of rules. One staged file adds a rule word, so
+every run must block exactly it. For each repository run_hook() is timed in a
+fresh worker process:
+
+- pre-commit with empty caches (cold);
+- pre-commit with only the per-blob scan cache warm (blobs);
+- pre-commit and commit-msg with the staged-tree outcome cached (outcome).
+
+Besides wall time, each run reports how many subprocesses the hook spawned
+and the peak RSS of the hook process and of its largest git child (n/a
+without /proc, e.g. on macOS). p50/p99, the subprocess counts and both peaks
+are compared against a stored baseline; the run fails when one regresses
+past the tolerance.
+
+Usage:
+    tests/bench-forbidden-words.py                        # default sweep
+    tests/bench-forbidden-words.py --files 100 2000 --file-size 65536
+    tests/bench-forbidden-words.py --rules 10 1000 --rename-ratio 0 0.5
+    tests/bench-forbidden-words.py --save-baseline        # store as baseline
+    tests/bench-forbidden-words.py --quick                # fewer runs
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HOOK = REPO_ROOT / "configs" / "git" / "forbidden_words.py"
+DEFAULT_BASELINE = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "git-forbidden-words"
+    / "bench-baseline.json"
+)
+# The hook only scans repositories it does not know to be private.
+REMOTE = "https://github.com/bench/forbidden-words.git"
+VOCABULARY = (
+    "alpha branch commit delta error future git hook index json kernel lambda "
+    "merge node object patch query rebase stash tree update value worker yield"
+).split()
+TIERS = ("cold", "blobs", "outcome")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    files: int
+    file_size: int
+    rules: int
+    rename_ratio: float
+
+    @property
+    def name(self) -> str:
+        return (
+            f"{self.files} files x {self.file_size} B, {self.rules} rules, "
+            f"{self.rename_ratio:.0%} renamed"
+        )
+
+
+def load_hook():
+    spec = importlib.util.spec_from_file_location("forbidden_words", HOOK)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["forbidden_words"] = module  # dataclasses resolve their module
+    spec.loader.exec_module(module)
+    return module
+
+
+def rule_word(index: int) -> str:
+    return f"forbidden{index:05d}"
+
+
+def filler(generator: random.Random, size: int) -> str:
+    """Roughly size bytes of lines of vocabulary words, none of them a rule."""
+    lines = []
+    written = 0
+    while written < size:
+        line = " ".join(generator.choices(VOCABULARY, k=10))
+        lines.append(line)
+        written += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def git(repository: Path, *args: str) -> None:
+    subprocess.run(["git", "-C", str(repository), *args], check=True)
+
+
+def make_repository(root: Path, scenario: Scenario) -> Path:
+    """A repository whose index renames or modifies every committed file."""
+    repository = root / "repository"
+    git(root, "init", "-q", str(repository))
+    git(repository, "remote", "add", "origin", REMOTE)
+    generator = random.Random(0)
+    paths = [
+        repository / f"src/{index % 50:02d}/file{index:05d}.txt"
+        for index in range(scenario.files)
+    ]
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(filler(generator, scenario.file_size))
+    git(repository, "add", "-A")
+    git(repository, "commit", "-q", "--no-verify", "-m", "Base")
+
+    renamed = int(scenario.files * scenario.rename_ratio)
+    for index, path in enumerate(paths):
+        if index < renamed:
+            target = path.with_name(f"moved{index:05d}.txt")
+            path.rename(target)
+            path = target
+        with path.open("a") as handle:
+            handle.write(filler(generator, max(1, scenario.file_size // 20)))
+    (repository / "leak.txt").write_text(f"one {rule_word(0)} here\n")
+    git(repository, "add", "-A")
+    return repository
+
+
+def write_rules(config: Path, count: int) -> None:
+    rules = config / "git" / "forbidden-words"
+    rules.parent.mkdir(parents=True, exist_ok=True)
+    rules.write_text(
+        "".join(f"{rule_word(index)}\tbenchmark rule\n" for index in range(count))
+    )
+
+
+def clear_caches(cache: Path, tier: str) -> None:
+    """Leave only the caches the tier's runs are meant to hit."""
+    scans = cache / "scans.sqlite3"
+    if tier == "cold":
+        for path in cache.glob("scans.sqlite3*"):
+            path.unlink()
+        (cache / "matcher.json").unlink(missing_ok=True)
+    elif tier == "blobs" and scans.exists():
+        connection = sqlite3.connect(scans)
+        with connection:
+            connection.execute("DELETE FROM outcomes")
+        connection.close()
+
+
+def sample_child_rss(
+    children: list[int], peak: list[int], stop: threading.Event
+) -> None:
+    """Track the largest VmHWM (KiB) of the hook's running git children.
+
+    rusage cannot tell: a child's ru_maxrss keeps the high-water mark of the
+    interpreter it was forked from across exec. /proc is read every
+    millisecond instead, so a git process that lives shorter than that may
+    be missed; those are the small ones.
+    """
+    while not stop.wait(0.001):
+        for pid in list(children):
+            try:
+                status = Path(f"/proc/{pid}/status").read_text()
+            except OSError:
+                continue
+            fields = dict(line.split(":", 1) for line in status.splitlines())
+            # Still the forked interpreter until the exec.
+            if fields.get("Name", "").strip() != "git" or "VmHWM" not in fields:
+                continue
+            peak[0] = max(peak[0], int(fields["VmHWM"].split()[0]))
+
+
+def run_worker(hook_name: str, arguments: list[str]) -> int:
+    """Time one run_hook() in this process and print its measurements as JSON."""
+    hook = load_hook()
+    children: list[int] = []
+    popen = subprocess.Popen
+
+    class CountingPopen(popen):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            children.append(self.pid)
+
+    stop = threading.Event()
+    child_rss = [0]
+    sampler = threading.Thread(
+        target=sample_child_rss, args=(children, child_rss, stop)
+    )
+    # Without /proc (macOS) the children's peak is unknown, not zero.
+    has_proc = Path("/proc/self/status").exists()
+    if has_proc:
+        sampler.start()
+
+    subprocess.Popen = CountingPopen
+    stderr = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stderr(stderr):
+        status = hook.run_hook(hook_name, arguments)
+    seconds = time.perf_counter() - start
+    subprocess.Popen = popen
+    stop.set()
+    if has_proc:
+        sampler.join()
+    measurement = {
+        "seconds": seconds,
+        "status": status,
+        "spawned": len(children),
+        # ru_maxrss is in KiB on Linux, bytes on macOS.
+        "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        * (1 if sys.platform == "darwin" else 1024),
+        "child_rss": child_rss[0] * 1024 if has_proc else None,
+        "output": stderr.getvalue(),
+    }
+    print(json.dumps(measurement))
+    return 0
+
+
+def measure(repository: Path, hook_name: str, arguments: list[str]) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, "--worker", hook_name, *arguments],
+        capture_output=True,
+        text=True,
+        cwd=repository,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def run_scenario(scenario: Scenario, runs: int, failures: list[str]) -> dict[str, dict]:
+    results: dict[str, list[dict]] = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        root = Path(scratch)
+        os.environ["XDG_CONFIG_HOME"] = str(root / "config")
+        os.environ["XDG_CACHE_HOME"] = str(root / "cache")
+        write_rules(root / "config", scenario.rules)
+        hook = load_hook()
+        cache = hook.cache_directory()
+        now = int(time.time())
+        hook.write_cached_visibility(hook.cache_path(REMOTE), "PUBLIC", now)
+        repository = make_repository(root, scenario)
+        message = root / "COMMIT_EDITMSG"
+        message.write_text("Benchmark commit\n")
+
+        for tier in TIERS:
+            for _ in range(runs):
+                clear_caches(cache, tier)
+                results.setdefault(f"pre-commit ({tier})", []).append(
+                    measure(repository, "pre-commit", [])
+                )
+        for _ in range(runs):
+            results.setdefault("commit-msg (outcome)", []).append(
+                measure(repository, "commit-msg", [str(message)])
+            )
+
+    summary = {}
+    for benchmark, measurements in results.items():
+        for measurement in measurements:
+            if measurement["status"] != 1 or "leak.txt" not in measurement["output"]:
+                failures.append(
+                    f"{scenario.name}, {benchmark}: the planted word was not blocked"
+                )
+                break
+        seconds = [measurement["seconds"] for measurement in measurements]
+        child_rss = [measurement["child_rss"] for measurement in measurements]
+        summary[benchmark] = {
+            "p50": percentile(seconds, 0.5),
+            "p99": percentile(seconds, 0.99),
+            "spawned": max(measurement["spawned"] for measurement in measurements),
+            "rss": max(measurement["rss"] for measurement in measurements),
+            "child_rss": None if None in child_rss else max(child_rss),
+        }
+    return summary
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def format_seconds(value: float) -> str:
+    return f"{value * 1e3:8.2f} ms" if value >= 1e-3 else f"{value * 1e6:8.1f} us"
+
+
+def format_bytes(value: int | None) -> str:
+    return f"{'n/a':>11}" if value is None else f"{value / (1 << 20):7.1f} MiB"
+
+
+def compare(
+    summary: dict[str, dict[str, dict]],
+    baseline: dict[str, dict[str, dict]],
+    tolerance: float,
+) -> list[str]:
+    regressions = []
+    for scenario, benchmarks in summary.items():
+        for name, stats in benchmarks.items():
+            reference = baseline.get(scenario, {}).get(name)
+            if reference is None:
+                continue
+            label = f"{scenario}, {name}"
+            for key in ("p50", "p99"):
+                # Absolute slack keeps process-scheduling noise from failing runs.
+                if stats[key] > reference[key] * (1 + tolerance) + 5e-3:
+                    regressions.append(
+                        f"{label} {key}: {format_seconds(stats[key]).strip()} > "
+                        f"baseline {format_seconds(reference[key]).strip()}"
+                    )
+            if stats["spawned"] > reference["spawned"]:
+                regressions.append(
+                    f"{label}: {stats['spawned']} subprocesses > "
+                    f"baseline {reference['spawned']}"
+                )
+            for key, title in (("rss", "peak RSS"), ("child_rss", "child RSS")):
+                # None where it could not be measured (no /proc on macOS).
+                if stats[key] is None or reference.get(key) is None:
+                    continue
+                if stats[key] > reference[key] * (1 + tolerance):
+                    regressions.append(
+                        f"{label}: {title} {format_bytes(stats[key]).strip()} > "
+                        f"baseline {format_bytes(reference[key]).strip()}"
+                    )
+    return regressions
+
+
+def main() -> int:
+    if sys.argv[1:2] == ["--worker"]:
+        return run_worker(sys.argv[2], sys.argv[3:])
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[100, 2000])
+    parser.add_argument("--file-size", type=int, nargs="+", default=[4096])
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 500])
+    parser.add_argument("--rename-ratio", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    # Keep the user's Git configuration (templates, hooks, signing) out of the
+    # generated repositories; the workers inherit this environment.
+    os.environ.update(
+        {
+            "GIT_CONFIG_GLOBAL": os.devnull,
+            "GIT_CONFIG_NOSYSTEM": "1",
+            "GIT_AUTHOR_NAME": "Benchmark",
+            "GIT_AUTHOR_EMAIL": "bench@example.com",
+            "GIT_COMMITTER_NAME": "Benchmark",
+            "GIT_COMMITTER_EMAIL": "bench@example.com",
+        }
+    )
+    runs = 2 if args.quick else 7
+    scenarios = [
+        Scenario(*parameters)
+        for parameters in itertools.product(
+            args.files, args.file_size, args.rules, args.rename_ratio
+        )
+    ]
+    summary: dict[str, dict[str, dict]] = {}
+    failures: list[str] = []
+    for scenario in scenarios:
+        summary[scenario.name] = run_scenario(scenario, runs, failures)
+
+    for scenario, benchmarks in summary.items():
+        print(f"{scenario}")
+        print(
+            f"  {'benchmark':<22} {'p50':>11} {'p99':>11} {'spawned':>8} "
+            f"{'peak RSS':>11} {'child RSS':>11}"
+        )
+        for name, stats in benchmarks.items():
+            print(
+                f"  {name:<22} {format_seconds(stats['p50'])} "
+                f"{format_seconds(stats['p99'])} {stats['spawned']:>8} "
+                f"{format_bytes(stats['rss'])} {format_bytes(stats['child_rss'])}"
+            )
+        print()
+
+    if failures:
+        print("Decision regressions:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(summary, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(summary, baseline, args.tolerance)
+    if regressions:
+        print("Regressions:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Latency benchmark and regression suite for the agent Bash guard hooks.
+
+Runs a corpus of realistic agent commands (long && chains, large heredoc
+commit messages, git -C paths, pathological quoting) through:
+
+- the pure functions: git_guard.check_command, sleep_guard.starts_with_sleep
+  and guard_rules.evaluate, plus guard_cache.evaluate answering from a warm
+  decision cache;
+- the adapters as real processes: Claude (bash-guard.py, exit code), Codex
+  (the codex/hooks symlink) and Gemini (JSON decision), both against a running
+  guard daemon and with the daemon unreachable (in-process fallback).
+
+Every case has an expected decision, so a behavior change fails the run
+before any timing is looked at, as does a command scanner that no longer
+scales linearly with the command's length. p50/p99 per benchmark are
+compared against a stored baseline and the run fails when one regresses
+past the tolerance.
+
+Usage:
+    tests/bench-guard-hooks.py                  # run, compare to baseline
+    tests/bench-guard-hooks.py --save-baseline  # run, store as new baseline
+    tests/bench-guard-hooks.py --quick          # fewer iterations
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HOOKS = REPO_ROOT / "configs" / "claude" / "hooks"
+ADAPTERS = {
+    "claude": HOOKS / "bash-guard.py",
+    "codex": REPO_ROOT / "configs" / "codex" / "hooks" / "block-git-rewrites.py",
+    "gemini": REPO_ROOT / "configs" / "gemini" / "hooks" / "block-git-rewrites.py",
+}
+DEFAULT_BASELINE = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "agent-guard"
+    / "bench-baseline.json"
+)
+MARKER = "EXPLICITLY_USER_APPROVED_HOOK_OVERRIDE=1"
+
+sys.path.insert(0, str(HOOKS))
+from git_guard import check_command, strip_quoted_strings  # noqa: E402
+from guard_cache import evaluate as evaluate_cached  # noqa: E402
+from guard_rules import evaluate  # noqa: E402
+from sleep_guard import starts_with_sleep  # noqa: E402
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    command: str
+    rule: str | None  # expected guard_rules decision (all rule sets)
+    repo: str = "feature"  # which scratch repo the command runs in
+
+
+def commit_message(lines: int) -> str:
+    body = "\n".join(
+        f"- step {i}: don't run \"git push --force\" or 'git add -A'; use $HOME/x | grep y && z"
+        for i in range(lines)
+    )
+    return f"Refactor the guard\n\n{body}"
+
+
+def corpus() -> list[Case]:
+    chain = " && ".join(
+        ["cd /srv/app", "uv run ruff check .", "uv run pytest -q -x", "git status --short"]
+        * 15
+    )
+    heredoc = f"git add src/guard.py && git commit -m \"$(cat <<'EOF'\n{commit_message(400)}\nEOF\n)\""
+    quoting = (
+        "echo \"a \\\"b\\\" 'c'\" 'd \"e\"' && printf '%s\\n' \"$(echo 'git push -f')\" "
+        + " ".join(['"x;y|z"', "'&&'"] * 500)
+    )
+    return [
+        Case("plain-tooling", "uv run ruff check . && uv run pytest -q -x", None),
+        Case("status-diff", "git status && git diff", None),
+        Case("long-chain", chain, None),
+        Case("long-chain-force", chain + " && git push --force", "git-blocked-pattern"),
+        Case("heredoc-commit", heredoc, None),
+        Case("heredoc-amend", heredoc.replace("git commit", "git commit --amend"), "git-blocked-pattern"),
+        Case("git-C-feature", 'git -C "/tmp/dir with spaces" status && git -C {repo} push', None),
+        Case("git-C-main", "git -C {repo} push -u origin", "git-protected-push", repo="main"),
+        Case("push-to-main", "git -C /srv/app push origin main", "git-protected-push"),
+        Case("pathological-quoting", quoting, None),
+        Case("unterminated-quote", 'echo "unterminated && git push --force', "git-blocked-pattern"),
+        # Decisions the regex stripping made that the scanner must not loosen.
+        Case("quote-continuation", 'echo "a\\\ngit push --force"', "git-blocked-pattern"),
+        Case("quoted-heredoc-merge", "echo 'gh pr merge$(cat <<'EOF'\n\nEOF\n)", "git-blocked-pattern"),
+        Case("quoted-heredoc-add", "echo 'x' 'git add -A$(cat <<EOF\n'\n EOF )", "git-blocked-pattern"),
+        Case("add-all-hard", f"{MARKER} git commit --amend && git add -A", "git-blocked-pattern"),
+        Case("gh-merge", "gh pr merge 123 --squash", "git-blocked-pattern"),
+        Case("sleep-chain", "sleep 30 && uv run pytest", "sleep"),
+        Case("sleep-background", "uv run pytest > log 2>&1 & sleep 120", "sleep"),
+        Case("sleep-quoted", 'python -c "import time; time.sleep(1)"', None),
+    ]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def make_repos(root: Path) -> dict[str, str]:
+    """Scratch repositories whose HEAD is on a feature branch and on main."""
+    repos = {}
+    for name, branch in (("feature", "feature/bench"), ("main", "main")):
+        git_dir = root / name / ".git"
+        git_dir.mkdir(parents=True)
+        (git_dir / "HEAD").write_text(f"ref: refs/heads/{branch}\n")
+        repos[name] = str(root / name)
+    return repos
+
+
+def resolve(case: Case, repos: dict[str, str]) -> tuple[str, str]:
+    cwd = repos[case.repo]
+    return case.command.replace("{repo}", cwd), cwd
+
+
+def check_decisions(cases: list[Case], repos: dict[str, str]) -> list[str]:
+    failures = []
+    for case in cases:
+        command, cwd = resolve(case, repos)
+        decision = evaluate(command, cwd)
+        rule = decision.rule if decision else None
+        if rule != case.rule:
+            failures.append(f"{case.name}: expected {case.rule}, got {rule}")
+        git_rule = case.rule if case.rule != "sleep" else None
+        if (check_command(command, cwd=cwd) is None) != (git_rule is None):
+            failures.append(f"{case.name}: check_command disagrees")
+        if starts_with_sleep(command) != (case.rule == "sleep"):
+            failures.append(f"{case.name}: starts_with_sleep disagrees")
+    return failures
+
+
+def check_scaling() -> list[str]:
+    """The scanner must stay linear on inputs that used to make it backtrack."""
+    inputs = {
+        "blank lines after an unterminated heredoc": lambda n: "$(cat <<EOF\n"
+        + "\n" * n
+        + "git push",
+        "repeated unterminated heredocs": lambda n: "$(cat <<EOF\nx\n" * (n // 4),
+        "unterminated heredocs in quotes": lambda n: '"$(cat <<EOF\n' * (n // 16),
+        "unterminated escaped quotes": lambda n: '"' + '\\"' * (n // 2),
+        "distinct unterminated heredocs": lambda n: "".join(
+            f"$(cat <<T{i}\n" for i in range(n // 12)
+        ),
+    }
+    failures = []
+    for name, make in inputs.items():
+        small, large = make(20_000), make(80_000)
+        timings = []
+        for command in (small, large):
+            start = time.perf_counter()
+            for _ in range(3):
+                strip_quoted_strings(command)
+            timings.append(time.perf_counter() - start)
+        # 4x the input may take 4x the time; allow generous noise, not 16x.
+        if timings[1] > 8 * timings[0] + 0.01:
+            failures.append(
+                f"scan scaling, {name}: {timings[0] * 1e3:.1f} ms -> "
+                f"{timings[1] * 1e3:.1f} ms for 4x the input"
+            )
+    return failures
+
+
+def time_function(function, arguments: list[tuple], iterations: int) -> list[float]:
+    samples = []
+    for args in arguments:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            function(*args)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def adapter_payload(tool: str, command: str) -> bytes:
+    tool_name = "run_shell_command" if tool == "gemini" else "Bash"
+    return json.dumps({"tool_name": tool_name, "tool_input": {"command": command}}).encode()
+
+
+def adapter_blocked(tool: str, result: subprocess.CompletedProcess) -> bool:
+    if tool == "gemini":
+        return json.loads(result.stdout)["decision"] == "deny"
+    return result.returncode == 2
+
+
+def time_adapter(
+    tool: str,
+    cases: list[Case],
+    repos: dict[str, str],
+    runtime_dir: str,
+    runs: int,
+    failures: list[str],
+) -> list[float]:
+    env = {**os.environ, "XDG_RUNTIME_DIR": runtime_dir}
+    # As codex/hooks.json runs it; the other adapters know their tool.
+    arguments = ["--tool", tool] if tool == "codex" else []
+    samples = []
+    for case in cases:
+        command, cwd = resolve(case, repos)
+        expected = case.rule is not None and (tool == "claude" or case.rule != "sleep")
+        payload = adapter_payload(tool, command)
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, str(ADAPTERS[tool]), *arguments],
+                input=payload,
+                capture_output=True,
+                cwd=cwd,
+                env=env,
+            )
+            samples.append(time.perf_counter() - start)
+        if adapter_blocked(tool, result) != expected:
+            failures.append(f"{tool} adapter, {case.name}: expected blocked={expected}")
+    return samples
+
+
+def start_daemon(runtime_dir: str) -> subprocess.Popen:
+    env = {**os.environ, "XDG_RUNTIME_DIR": runtime_dir}
+    daemon = subprocess.Popen([sys.executable, str(HOOKS / "guard_server.py")], env=env)
+    socket_file = Path(runtime_dir) / f"agent-guard-{os.getuid()}.sock"
+    deadline = time.monotonic() + 5
+    while not socket_file.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return daemon
+
+
+def run(iterations: int, runs: int) -> tuple[dict[str, dict[str, float]], list[str]]:
+    cases = corpus()
+    results: dict[str, list[float]] = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        repos = make_repos(Path(scratch) / "repos")
+        failures = check_decisions(cases, repos) + check_scaling()
+        resolved = [resolve(case, repos) for case in cases]
+
+        results["check_command"] = time_function(
+            lambda c, d: check_command(c, cwd=d), resolved, iterations
+        )
+        results["starts_with_sleep"] = time_function(
+            starts_with_sleep, [(c,) for c, _ in resolved], iterations
+        )
+        results["guard_rules.evaluate"] = time_function(evaluate, resolved, iterations)
+        os.environ["XDG_CACHE_HOME"] = str(Path(scratch) / "cache")
+        for command, cwd in resolved:
+            evaluate_cached(command, cwd)
+        results["guard_cache.evaluate (hit)"] = time_function(
+            evaluate_cached, resolved, iterations
+        )
+
+        runtime_dir = Path(scratch) / "run"
+        runtime_dir.mkdir()
+        daemon = start_daemon(str(runtime_dir))
+        try:
+            for tool in ADAPTERS:
+                results[f"{tool} adapter (daemon)"] = time_adapter(
+                    tool, cases, repos, str(runtime_dir), runs, failures
+                )
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+        # A runtime dir that does not exist: no daemon can bind, every call
+        # checks in-process.
+        missing = str(Path(scratch) / "missing")
+        for tool in ADAPTERS:
+            results[f"{tool} adapter (fallback)"] = time_adapter(
+                tool, cases, repos, missing, runs, failures
+            )
+
+    summary = {
+        name: {"p50": percentile(samples, 0.5), "p99": percentile(samples, 0.99)}
+        for name, samples in results.items()
+    }
+    return summary, failures
+
+
+def format_seconds(value: float) -> str:
+    return f"{value * 1e3:8.2f} ms" if value >= 1e-3 else f"{value * 1e6:8.1f} us"
+
+
+def compare(
+    summary: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    regressions = []
+    for name, stats in summary.items():
+        for key in ("p50", "p99"):
+            reference = baseline.get(name, {}).get(key)
+            if reference is None:
+                continue
+            # Absolute slack keeps microsecond-scale noise from failing runs.
+            slack = 50e-6 if "adapter" not in name else 5e-3
+            if stats[key] > reference * (1 + tolerance) + slack:
+                regressions.append(
+                    f"{name} {key}: {format_seconds(stats[key]).strip()} > "
+                    f"baseline {format_seconds(reference).strip()}"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    iterations, runs = (20, 2) if args.quick else (200, 10)
+    summary, failures = run(iterations, runs)
+
+    print(f"{'benchmark':<28} {'p50':>11} {'p99':>11}")
+    for name, stats in summary.items():
+        print(f"{name:<28} {format_seconds(stats['p50'])} {format_seconds(stats['p99'])}")
+
+    if failures:
+        print("\nDecision regressions:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(summary, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    regressions = compare(summary, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print("\nLatency regressions:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
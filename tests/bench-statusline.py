@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Replay benchmark for the Claude statusline (configs/claude/statusline.py).
+
+Replays a corpus of captured statusline inputs (CLAUDE_STATUSLINE_CAPTURE=1
+writes one JSON input per line to $XDG_CACHE_HOME/claude-statusline/capture)
+through the renderer:
+
+- in-process, via statusline_render.render(), reporting p50/p99 per segment (parse,
+  model, effort, git, host, context, activity, cost, fleet) and in total;
+- as a subprocess, the way Claude runs it, reporting end-to-end latency;
+- interpreter startup alone and with the renderer imported, plus the
+  renderer's heaviest imports (python -X importtime).
+
+Both modes render against one scratch cache that is warmed first (including
+the background git status refresh), and must print identical lines. With
+--save-expected the outputs are stored; later runs fail when any output is
+no longer byte-identical. Outputs depend on the repositories and host the
+inputs point at, so compare on the same machine and checkout state.
+
+Usage:
+    tests/bench-statusline.py                         # replay the capture dir
+    tests/bench-statusline.py --corpus DIR --quick    # other corpus, fewer runs
+    tests/bench-statusline.py --save-expected FILE    # store the outputs
+    tests/bench-statusline.py --expected FILE         # fail on changed output
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STATUSLINE = REPO_ROOT / "configs" / "claude" / "statusline.py"
+RENDERER = STATUSLINE.with_name("statusline_render.py")
+DEFAULT_CORPUS = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "claude-statusline"
+    / "capture"
+)
+
+
+def load_statusline():
+    spec = importlib.util.spec_from_file_location("statusline_render", RENDERER)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["statusline_render"] = module  # dataclasses resolve their module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_corpus(directory: Path) -> list[tuple[str, dict]]:
+    """(location, input) pairs from *.jsonl (one per line) and *.json files."""
+    inputs = []
+    for path in sorted(directory.glob("*.json*")):
+        if path.suffix == ".json":
+            inputs.append((path.name, json.loads(path.read_text())))
+        elif path.suffix == ".jsonl":
+            for number, line in enumerate(path.read_text().splitlines(), 1):
+                if line.strip():
+                    inputs.append((f"{path.name}:{number}", json.loads(line)))
+    return inputs
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def format_seconds(value: float) -> str:
+    return f"{value * 1e3:8.2f} ms" if value >= 1e-3 else f"{value * 1e6:8.1f} us"
+
+
+def wait_for_refreshers(cache: Path, timeout: float = 30) -> None:
+    """Let background git status refreshers started while warming finish."""
+    deadline = time.monotonic() + timeout
+    while any(cache.glob("claude-statusline/status/*.lock")):
+        if time.monotonic() > deadline:
+            return
+        time.sleep(0.05)
+
+
+def render_subprocess(raw: dict, env: dict[str, str]) -> tuple[str, float]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(STATUSLINE)],
+        input=json.dumps(raw),
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    return result.stdout, time.perf_counter() - start
+
+
+def measure_startup(runs: int) -> dict[str, list[float]]:
+    """Wall time of a bare interpreter and of one that imports the renderer."""
+    programs = {
+        "python startup": "pass",
+        "python + import": f"import sys; sys.path.insert(0, {str(RENDERER.parent)!r}); "
+        "import statusline_render",
+    }
+    samples: dict[str, list[float]] = {}
+    for name, program in programs.items():
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", program], check=True)
+            samples.setdefault(name, []).append(time.perf_counter() - start)
+    return samples
+
+
+def import_breakdown(limit: int = 8) -> list[tuple[str, int]]:
+    """The renderer's own and its direct imports' cumulative import time (us)."""
+    program = (
+        f"import sys; sys.path.insert(0, {str(RENDERER.parent)!r}); import statusline_render"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", program],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        head, cumulative, name = line.split("|")
+        self_us = head.removeprefix("import time:")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if name.strip() == "statusline_render":
+            entries.append(("statusline_render (self)", int(self_us)))
+        elif depth == 1:
+            entries.append((name.strip(), int(cumulative)))
+    return sorted(entries, key=lambda entry: -entry[1])[:limit]
+
+
+def run(
+    inputs: list[tuple[str, dict]], iterations: int, runs: int
+) -> tuple[dict[str, list[float]], dict[str, str], list[str]]:
+    statusline = load_statusline()
+    samples: dict[str, list[float]] = {}
+    outputs: dict[str, str] = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ["XDG_CACHE_HOME"] = scratch
+        os.environ.pop(statusline.CAPTURE_ENV, None)
+        env = dict(os.environ)
+        for _, raw in inputs:
+            statusline.render(raw)
+        wait_for_refreshers(Path(scratch))
+
+        for location, raw in inputs:
+            for _ in range(iterations):
+                timings: dict[str, float] = {}
+                start = time.perf_counter()
+                line = statusline.render(raw, timings)
+                samples.setdefault("total (in-process)", []).append(
+                    time.perf_counter() - start
+                )
+                for name, seconds in timings.items():
+                    samples.setdefault(name, []).append(seconds)
+            outputs[location] = line + "\n"
+
+        for location, raw in inputs:
+            for _ in range(runs):
+                printed, seconds = render_subprocess(raw, env)
+                samples.setdefault("total (subprocess)", []).append(seconds)
+            if printed != outputs[location]:
+                failures.append(f"{location}: subprocess output differs from render()")
+    return samples, outputs, failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--expected", type=Path)
+    parser.add_argument("--save-expected", type=Path)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    inputs = load_corpus(args.corpus) if args.corpus.is_dir() else []
+    if not inputs:
+        print(
+            f"No inputs in {args.corpus}; capture some with "
+            "CLAUDE_STATUSLINE_CAPTURE=1 or pass --corpus.",
+            file=sys.stderr,
+        )
+        return 1
+
+    iterations, runs = (10, 1) if args.quick else (100, 5)
+    samples, outputs, failures = run(inputs, iterations, runs)
+    samples.update(measure_startup(max(runs, 5)))
+
+    print(f"{len(inputs)} inputs from {args.corpus}\n")
+    print(f"{'segment':<22} {'p50':>11} {'p99':>11}")
+    for name, values in samples.items():
+        print(
+            f"{name:<22} {format_seconds(percentile(values, 0.5))} "
+            f"{format_seconds(percentile(values, 0.99))}"
+        )
+
+    print(f"\n{'import (cumulative)':<26} {'us':>8}")
+    for name, micros in import_breakdown():
+        print(f"{name:<26} {micros:>8}")
+
+    if args.expected is not None:
+        expected = json.loads(args.expected.read_text())
+        for location, line in outputs.items():
+            if location in expected and expected[location] != line:
+                failures.append(
+                    f"{location}: output changed\n    was {expected[location]!r}\n"
+                    f"    now {line!r}"
+                )
+    if failures:
+        print("\nOutput mismatches:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+    if args.save_expected is not None:
+        args.save_expected.write_text(json.dumps(outputs, indent=2, ensure_ascii=False) + "\n")
+        print(f"\nOutputs saved to {args.save_expected}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
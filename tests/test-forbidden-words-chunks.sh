@@ -0,0 +1,96 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+repo_root=$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)
+hook="$repo_root/configs/git/forbidden_words.py"
+test_root=$(mktemp -d)
+trap 'rm -rf "$test_root"' EXIT
+
+mkdir -p "$test_root/bin" "$test_root/config/git"
+printf 'secret\tno secrets\n' >"$test_root/config/git/forbidden-words"
+printf '#!/bin/sh\nprintf "PUBLIC\\n"\n' >"$test_root/bin/gh"
+chmod +x "$test_root/bin/gh"
+
+export PATH="$test_root/bin:$PATH"
+export XDG_CONFIG_HOME="$test_root/config"
+export XDG_CACHE_HOME="$test_root/cache"
+export GIT_CONFIG_GLOBAL=/dev/null
+export GIT_CONFIG_NOSYSTEM=1
+unset GIT_FORBIDDEN_WORDS_MAX_BLOB_SIZE GIT_FORBIDDEN_WORDS_LARGE_BLOBS
+
+repository="$test_root/repository"
+git init -q "$repository"
+cd "$repository"
+git remote add origin https://github.com/acme/chunks.git
+
+# Write $1 with the Python expression $2 (bytes) and stage only it.
+stage_only() {
+  git rm -q --cached -r --ignore-unmatch . >/dev/null
+  python3 -c 'import sys; open(sys.argv[1], "wb").write(eval(sys.argv[2]))' "$1" "$2"
+  git add "$1"
+}
+
+expect_blocked() {
+  if python3 "$hook" pre-commit 2>"$test_root/out"; then
+    printf 'pre-commit accepted %s\n' "$1" >&2
+    exit 1
+  fi
+  grep -q "^  $1: secret" "$test_root/out"
+}
+
+expect_allowed() {
+  if ! python3 "$hook" pre-commit 2>"$test_root/out"; then
+    printf 'pre-commit blocked %s:\n' "$1" >&2
+    cat "$test_root/out" >&2
+    exit 1
+  fi
+}
+
+# The diff is read SCAN_CHUNK (1 Mi) characters at a time, counting the +
+# of the added line. Split the word after each of its first five letters.
+for split in 1 2 3 4 5; do
+  stage_only "split-$split" "b'x' * ((1 << 20) - 1 - $split) + b'secret\\n'"
+  expect_blocked "split-$split"
+done
+
+# A lone CR inside an added line does not end it: the text after it is
+# scanned as part of the line (it used to be dropped as a context line).
+stage_only lone-cr "b'clean\\rsecret\\n'"
+expect_blocked lone-cr
+stage_only crlf "b'a secret\\r\\nclean\\r\\n'"
+expect_blocked crlf
+stage_only split-by-cr "b'sec\\rret\\n'"
+expect_allowed split-by-cr
+
+# Blobs over GIT_FORBIDDEN_WORDS_MAX_BLOB_SIZE are not diffed; "sample"
+# (the default) checks their first LARGE_BLOB_SAMPLE (1 MiB) bytes.
+export GIT_FORBIDDEN_WORDS_MAX_BLOB_SIZE=1000
+stage_only early "b'a secret\\n' + b'x' * 2000"
+expect_blocked early
+grep -q '^Forbidden-word scan checked only the first 2009 bytes of early' "$test_root/out"
+
+stage_only late "b'x\\n' * (1 << 20) + b'a secret\\n'"
+expect_allowed late
+grep -q '^Forbidden-word scan checked only the first 1048576 bytes of late' "$test_root/out"
+
+# Binary blobs, by git's own test, are skipped even when sampling.
+stage_only binary "b'\\0' + b'a secret\\n' * 200"
+expect_allowed binary
+grep -q '^Forbidden-word scan skipped binary' "$test_root/out"
+
+# "skip" leaves large blobs unscanned, and says so.
+GIT_FORBIDDEN_WORDS_LARGE_BLOBS=skip
+export GIT_FORBIDDEN_WORDS_LARGE_BLOBS
+stage_only early "b'a secret\\n' + b'x' * 2000"
+expect_allowed early
+grep -q '^Forbidden-word scan skipped early (2009 bytes)' "$test_root/out"
+
+# A limit of 0 turns the cap off: the whole blob is scanned again, even
+# though it was cached under the skip policy.
+GIT_FORBIDDEN_WORDS_MAX_BLOB_SIZE=0
+stage_only late "b'x\\n' * (1 << 20) + b'a secret\\n'"
+expect_blocked late
+stage_only early "b'a secret\\n' + b'x' * 2000"
+expect_blocked early
+
+printf 'forbidden-words chunk tests passed\n'
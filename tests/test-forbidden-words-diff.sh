@@ -0,0 +1,87 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+repo_root=$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)
+hook="$repo_root/configs/git/forbidden_words.py"
+test_root=$(mktemp -d)
+trap 'rm -rf "$test_root"' EXIT
+
+mkdir -p "$test_root/bin" "$test_root/config/git"
+printf 'secret\tno secrets\n' >"$test_root/config/git/forbidden-words"
+printf '#!/bin/sh\nprintf "PUBLIC\\n"\n' >"$test_root/bin/gh"
+chmod +x "$test_root/bin/gh"
+
+export PATH="$test_root/bin:$PATH"
+export XDG_CONFIG_HOME="$test_root/config"
+export XDG_CACHE_HOME="$test_root/cache"
+export GIT_CONFIG_GLOBAL=/dev/null
+export GIT_CONFIG_NOSYSTEM=1
+export GIT_AUTHOR_NAME=Test GIT_AUTHOR_EMAIL=test@example.com
+export GIT_COMMITTER_NAME=Test GIT_COMMITTER_EMAIL=test@example.com
+
+repository="$test_root/repository"
+git init -q "$repository"
+cd "$repository"
+git remote add origin https://github.com/acme/diff.git
+
+# Each staged file is checked against its own added lines only.
+expect_blocked() {
+  if python3 "$hook" pre-commit 2>"$test_root/out"; then
+    printf 'pre-commit accepted: %s\n' "$1" >&2
+    exit 1
+  fi
+  sort "$test_root/out" >"$test_root/got"
+  if ! diff -u "$test_root/expected" "$test_root/got"; then
+    printf 'wrong report: %s\n' "$1" >&2
+    exit 1
+  fi
+}
+
+printf 'old secret\nkept\n' >modified
+printf 'a secret\n' >deleted
+printf 'a secret\n' >renamed
+printf 'clean\n' >clean
+git add modified deleted renamed clean
+git commit -q --no-verify -m 'Start'
+
+# Only added lines count: the existing secret in modified, the deleted file
+# and the clean file report nothing. A rename counts as added in full, and
+# paths git quotes or that look like diff headers resolve to themselves.
+printf 'old secret\nkept\nnew\n' >modified
+git rm -q deleted
+mkdir 'moved b'
+git mv renamed 'moved b/renamed'
+printf 'secret\n' >'with space'
+printf 'secret\n' >'tab	"quote'
+printf 'secret\n' >'ünïcode'
+printf 'secret\n' >'a b'
+git add -A
+cat >"$test_root/expected" <<'EOF'
+  a b: secret - no secrets
+  moved b/renamed: secret - no secrets
+  tab	"quote: secret - no secrets
+  with space: secret - no secrets
+  ünïcode: secret - no secrets
+Commit blocked by forbidden-word rules:
+EOF
+sort -o "$test_root/expected" "$test_root/expected"
+expect_blocked 'one diff over several files'
+
+# A line added to a file that already holds the word is reported on its own.
+git reset -q --hard
+printf 'old secret\nkept\nanother secret\n' >modified
+git add modified
+cat >"$test_root/expected" <<'EOF'
+  modified: secret - no secrets
+Commit blocked by forbidden-word rules:
+EOF
+sort -o "$test_root/expected" "$test_root/expected"
+expect_blocked 'added line in a modified file'
+
+# Removing the word is fine.
+git reset -q --hard
+printf 'old\nkept\n' >modified
+git add modified
+python3 "$hook" pre-commit
+
+printf 'forbidden-words diff tests passed\n'
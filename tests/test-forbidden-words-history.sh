@@ -0,0 +1,60 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+repo_root=$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)
+hook="$repo_root/configs/git/forbidden_words.py"
+test_root=$(mktemp -d)
+trap 'rm -rf "$test_root"' EXIT
+
+mkdir -p "$test_root/config/git"
+printf 'secret\tno secrets\n' >"$test_root/config/git/forbidden-words"
+export XDG_CONFIG_HOME="$test_root/config"
+export XDG_CACHE_HOME="$test_root/cache"
+export GIT_CONFIG_GLOBAL=/dev/null
+export GIT_CONFIG_NOSYSTEM=1
+export GIT_AUTHOR_NAME=Test GIT_AUTHOR_EMAIL=test@example.com
+export GIT_COMMITTER_NAME=Test GIT_COMMITTER_EMAIL=test@example.com
+
+repository="$test_root/repository"
+git init -q "$repository"
+cd "$repository"
+
+# The forbidden word only ever appears in the root commit, and the user's
+# configuration hides root commit diffs from git log.
+git config log.showRoot false
+printf 'a secret\n' >leak
+git add leak
+git commit -q --no-verify -m 'Add leak'
+printf 'clean\n' >leak
+git commit -q --no-verify -am 'Remove leak'
+
+if python3 "$hook" audit --restart >"$test_root/audit.out" 2>&1; then
+  printf 'audit missed the root commit:\n' >&2
+  cat "$test_root/audit.out" >&2
+  exit 1
+fi
+grep -q "$(git rev-parse --short=12 HEAD~1) leak: secret" "$test_root/audit.out"
+
+# pre-push: a blob that cannot be read fails the push with a clear error.
+remote="$test_root/remote.git"
+git init -q --bare "$remote"
+git remote add origin "$remote"
+git push -q origin HEAD:refs/heads/main
+printf 'another secret\n' >leak
+git commit -q --no-verify -am 'Leak again'
+old_blob=$(git rev-parse HEAD~1:leak)
+rm "$repository/.git/objects/${old_blob:0:2}/${old_blob:2}"
+printf 'refs/heads/main %s refs/heads/main %s\n' \
+  "$(git rev-parse HEAD)" "$(git rev-parse origin/main)" >"$test_root/updates"
+if python3 "$hook" pre-push origin "$remote" \
+  <"$test_root/updates" >"$test_root/push.out" 2>&1; then
+  printf 'pre-push accepted a push it could not scan\n' >&2
+  exit 1
+fi
+grep -q '^Forbidden-word scan of the push failed' "$test_root/push.out"
+if grep -q Traceback "$test_root/push.out"; then
+  cat "$test_root/push.out" >&2
+  exit 1
+fi
+
+printf 'forbidden-words history tests passed\n'
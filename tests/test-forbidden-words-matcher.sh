@@ -0,0 +1,65 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+repo_root=$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)
+hook="$repo_root/configs/git/forbidden_words.py"
+test_root=$(mktemp -d)
+trap 'rm -rf "$test_root"' EXIT
+
+mkdir -p "$test_root/bin" "$test_root/config/git"
+printf '#!/bin/sh\nprintf "PUBLIC\\n"\n' >"$test_root/bin/gh"
+chmod +x "$test_root/bin/gh"
+# Prefixes of each other (sec, secret, secretive), a word inside another
+# (cret, bcd) and words that overlap without containing each other (abcd,
+# cdef).
+cat >"$test_root/config/git/forbidden-words" <<'EOF'
+Sec	prefix
+secret	no secrets
+secretive	longest
+cret	inside
+abcd	left
+cdef	right
+bcd	middle
+EOF
+
+export PATH="$test_root/bin:$PATH"
+export XDG_CONFIG_HOME="$test_root/config"
+export XDG_CACHE_HOME="$test_root/cache"
+export GIT_CONFIG_GLOBAL=/dev/null
+export GIT_CONFIG_NOSYSTEM=1
+
+repository="$test_root/repository"
+git init -q "$repository"
+cd "$repository"
+git remote add origin https://github.com/acme/matcher.git
+
+# Stage $1 as the only change and compare the words reported for it.
+expect_words() {
+  git rm -q --cached -r --ignore-unmatch . >/dev/null
+  printf '%s\n' "$1" >staged
+  git add staged
+  python3 "$hook" pre-commit 2>"$test_root/out" || true
+  sed -n 's/^  staged: \([^ ]*\) - .*/\1/p' "$test_root/out" | sort >"$test_root/got"
+  printf '%s\n' "${@:2}" | sed '/^$/d' | sort >"$test_root/expected"
+  if ! diff -u "$test_root/expected" "$test_root/got"; then
+    printf 'wrong words for %q\n' "$1" >&2
+    exit 1
+  fi
+}
+
+# Every rule whose word occurs is reported, including the shorter words a
+# longer match starts with or contains, in any case.
+expect_words 'a SecretIVE plan' Sec secret secretive cret
+expect_words 'secret' Sec secret cret
+expect_words 'secre' Sec
+expect_words 'xabcdefx' abcd bcd cdef
+expect_words 'abcd cdef' abcd bcd cdef
+expect_words 'abc def' ''
+# Adjacent and repeated matches are all found.
+expect_words 'cdefabcd secsecret' Sec secret cret abcd bcd cdef
+
+# The compiled matcher is cached; a second run answers the same.
+[[ -f "$XDG_CACHE_HOME/git-forbidden-words/matcher.json" ]]
+expect_words 'xabcdefx' abcd bcd cdef
+
+printf 'forbidden-words matcher tests passed\n'
@@ -0,0 +1,83 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+repo_root=$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)
+hook="$repo_root/configs/git/forbidden_words.py"
+test_root=$(mktemp -d)
+trap 'rm -rf "$test_root"' EXIT
+
+mkdir -p "$test_root/bin" "$test_root/config/git"
+printf 'secret\tno secrets\n' >"$test_root/config/git/forbidden-words"
+printf '#!/bin/sh\nprintf "PUBLIC\\n"\n' >"$test_root/bin/gh"
+chmod +x "$test_root/bin/gh"
+
+export PATH="$test_root/bin:$PATH"
+export XDG_CONFIG_HOME="$test_root/config"
+export XDG_CACHE_HOME="$test_root/cache"
+export GIT_CONFIG_GLOBAL=/dev/null
+export GIT_CONFIG_NOSYSTEM=1
+export GIT_AUTHOR_NAME=Test GIT_AUTHOR_EMAIL=test@example.com
+export GIT_COMMITTER_NAME=Test GIT_COMMITTER_EMAIL=test@example.com
+scans="$XDG_CACHE_HOME/git-forbidden-words/scans.sqlite3"
+
+repository="$test_root/repository"
+git init -q "$repository"
+cd "$repository"
+git remote add origin https://github.com/acme/outcome-cache.git
+message="$test_root/COMMIT_EDITMSG"
+printf 'Update notes\n' >"$message"
+
+sql() {
+  python3 -c 'import sqlite3, sys
+connection = sqlite3.connect(sys.argv[1])
+with connection:
+    for row in connection.execute(sys.argv[2]):
+        print(*row)' "$scans" "$1"
+}
+
+expect_blocked() {
+  if python3 "$hook" "$@" 2>"$test_root/out"; then
+    printf '%s accepted staged notes with a secret\n' "$1" >&2
+    exit 1
+  fi
+  grep -q '^  notes: secret' "$test_root/out"
+}
+
+printf 'clean\n' >notes
+git add notes
+git commit -q --no-verify -m 'Add notes'
+
+printf 'still clean\n' >notes
+git add notes
+python3 "$hook" pre-commit
+[[ $(sql 'SELECT count(*) FROM outcomes') == 1 ]]
+
+# commit-msg, on the same staged trees, answers from pre-commit's outcome.
+sql "UPDATE outcomes SET violations = '[[\"cached\", 0]]'"
+if python3 "$hook" commit-msg "$message" 2>"$test_root/out"; then
+  printf 'commit-msg did not use the cached outcome\n' >&2
+  exit 1
+fi
+grep -q '^  cached: secret' "$test_root/out"
+
+# Restaging the file changes the index tree: both hooks scan again.
+printf 'a secret\n' >notes
+git add notes
+expect_blocked pre-commit
+expect_blocked commit-msg "$message"
+
+# And a blocked outcome does not outlive the fix.
+printf 'clean again\n' >notes
+git add notes
+python3 "$hook" pre-commit
+python3 "$hook" commit-msg "$message"
+
+# `git commit -a` and `git commit <path>` stage into a temporary index; its
+# tree, not the one of the regular index, decides the outcome.
+cp .git/index "$test_root/index"
+printf 'another secret\n' >notes
+GIT_INDEX_FILE="$test_root/index" git add notes
+GIT_INDEX_FILE="$test_root/index" expect_blocked pre-commit
+python3 "$hook" pre-commit
+
+printf 'forbidden-words outcome cache tests passed\n'
@@ -0,0 +1,72 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+repo_root=$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)
+hook="$repo_root/configs/git/forbidden_words.py"
+test_root=$(mktemp -d)
+trap 'rm -rf "$test_root"' EXIT
+
+rules="$test_root/config/git/forbidden-words"
+mkdir -p "$test_root/bin" "$test_root/config/git"
+printf 'secret\tno secrets\n' >"$rules"
+printf '#!/bin/sh\nprintf "PUBLIC\\n"\n' >"$test_root/bin/gh"
+chmod +x "$test_root/bin/gh"
+
+export PATH="$test_root/bin:$PATH"
+export XDG_CONFIG_HOME="$test_root/config"
+export XDG_CACHE_HOME="$test_root/cache"
+export GIT_CONFIG_GLOBAL=/dev/null
+export GIT_CONFIG_NOSYSTEM=1
+scans="$XDG_CACHE_HOME/git-forbidden-words/scans.sqlite3"
+
+repository="$test_root/repository"
+git init -q "$repository"
+cd "$repository"
+git remote add origin https://github.com/acme/scan-cache.git
+
+sql() {
+  python3 -c 'import sqlite3, sys
+connection = sqlite3.connect(sys.argv[1])
+with connection:
+    for row in connection.execute(sys.argv[2]):
+        print(*row)' "$scans" "$1"
+}
+
+# Stage another clean file so the staged trees, and with them the cached
+# outcome of the whole commit, change while notes keeps its blob pair.
+other=0
+restage_other() {
+  other=$((other + 1))
+  printf 'clean\n' >"other-$other"
+  git add "other-$other"
+}
+
+printf 'a token\n' >notes
+git add notes
+python3 "$hook" pre-commit
+[[ $(sql 'SELECT count(*) FROM scans') -ge 1 ]]
+
+# The stored words of an unchanged blob pair are used as they are.
+sql "UPDATE scans SET words = '[\"secret\"]'"
+restage_other
+if python3 "$hook" pre-commit 2>"$test_root/out"; then
+  printf 'pre-commit did not use the cached scan\n' >&2
+  exit 1
+fi
+grep -q '^  notes: secret' "$test_root/out"
+
+# Editing the rules file invalidates every cached scan: notes is scanned
+# again, finds the new word and no longer reports the cached one.
+printf 'secret\tno secrets\ntoken\tno tokens\n' >"$rules"
+restage_other
+if python3 "$hook" pre-commit 2>"$test_root/out"; then
+  printf 'pre-commit kept a cached scan after the rules changed\n' >&2
+  exit 1
+fi
+grep -q '^  notes: token' "$test_root/out"
+if grep -q '^  notes: secret' "$test_root/out"; then
+  printf 'pre-commit reported a scan cached under the old rules\n' >&2
+  exit 1
+fi
+
+printf 'forbidden-words scan cache tests passed\n'
@@ -0,0 +1,87 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+repo_root=$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)
+hook="$repo_root/configs/git/forbidden_words.py"
+test_root=$(mktemp -d)
+trap 'rm -rf "$test_root"' EXIT
+
+log="$test_root/gh.log"
+mkdir -p "$test_root/bin" "$test_root/config/git"
+printf 'secret\tno secrets\n' >"$test_root/config/git/forbidden-words"
+
+cat >"$test_root/bin/gh" <<'STUB'
+#!/usr/bin/env bash
+set -euo pipefail
+
+printf '%s\n' "$*" >>"${GH_TEST_LOG:?}"
+
+case "$1 $2" in
+  "repo view") cat "${GH_TEST_VISIBILITY:?}" ;;
+  "api graphql") cat "${GH_TEST_GRAPHQL:?}" ;;
+  *) exit 1 ;;
+esac
+STUB
+chmod +x "$test_root/bin/gh"
+
+export PATH="$test_root/bin:$PATH"
+export XDG_CONFIG_HOME="$test_root/config"
+export XDG_CACHE_HOME="$test_root/cache"
+export GH_TEST_LOG="$log"
+export GH_TEST_VISIBILITY="$test_root/visibility"
+export GH_TEST_GRAPHQL="$test_root/graphql.json"
+unset GIT_FORBIDDEN_WORDS_VISIBILITY_TTL
+
+make_repository() {
+  git init -q "$test_root/$1"
+  git -C "$test_root/$1" remote add origin "$2"
+  printf 'a secret\n' >"$test_root/$1/leak"
+  git -C "$test_root/$1" add leak
+}
+
+run_hook() {
+  (cd "$test_root/$1" && python3 "$hook" pre-commit) 2>/dev/null
+}
+
+lookups() {
+  grep -c "^$1" "$log" || true
+}
+
+make_repository alpha https://github.com/acme/alpha.git
+touch "$log"
+
+# A never-seen remote is looked up before the commit may proceed.
+printf 'PRIVATE\n' >"$GH_TEST_VISIBILITY"
+run_hook alpha
+[[ $(lookups "repo view") == 1 ]]
+
+# A fresh entry is served without asking gh.
+run_hook alpha
+[[ $(lookups "repo view") == 1 ]]
+
+# An expired entry is still served; a detached refresh fetches the new one.
+printf 'PUBLIC\n' >"$GH_TEST_VISIBILITY"
+GIT_FORBIDDEN_WORDS_VISIBILITY_TTL=0 run_hook alpha
+for _ in $(seq 50); do
+  grep -qs PUBLIC "$XDG_CACHE_HOME"/git-forbidden-words/*.json && break
+  sleep 0.1
+done
+[[ $(lookups "repo view") == 2 ]]
+if run_hook alpha; then
+  printf 'hook did not pick up the refreshed visibility\n' >&2
+  exit 1
+fi
+
+# One GraphQL query warms every remote of the given repositories.
+make_repository beta git@github.com:acme/beta.git
+cat >"$GH_TEST_GRAPHQL" <<'EOF'
+{"data": {"r0": {"visibility": "PRIVATE"}, "r1": {"visibility": "PUBLIC"}}}
+EOF
+python3 "$hook" prefetch-visibility "$test_root/alpha" "$test_root/beta" >/dev/null
+[[ $(lookups "api graphql") == 1 ]]
+grep -q 'name: "alpha"' "$log"
+grep -q 'name: "beta"' "$log"
+run_hook beta
+[[ $(lookups "repo view") == 2 ]]
+
+printf 'forbidden-words visibility tests passed\n'